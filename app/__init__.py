@@ -1,10 +1,16 @@
 from flask import Flask, Response, jsonify
+from flask.json.provider import DefaultJSONProvider
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 import os
 import json
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables automatically
 from dotenv import load_dotenv
 load_dotenv()
@@ -12,8 +18,33 @@ load_dotenv()
 db = SQLAlchemy()
 migrate = Migrate()
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes jsonify() responses with orjson.
+
+    Dates, Decimals and other non-native types go through Flask's default
+    handler, and dicts with non-string keys fall back to the stdlib encoder
+    (so mixed-key dicts still raise TypeError). Output is not byte-for-byte
+    the stdlib's: NaN and infinities become null instead of NaN/Infinity,
+    and non-ASCII text is written as raw UTF-8 instead of \\u escapes.
+    """
+
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_PASSTHROUGH_DATETIME
+        if kwargs.get('sort_keys', self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get('indent') or (self.compact is None and self._app.debug):
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(obj, default=self.default, option=option).decode('utf-8')
+        except TypeError:
+            # Fall back to the stdlib encoder for anything orjson rejects
+            return super().dumps(obj, **kwargs)
+
 def create_app():
     app = Flask(__name__)
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
     
     # Configuration
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'dev-secret-key')
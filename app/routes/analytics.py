@@ -14,9 +14,19 @@ import os
 
 analytics_bp = Blueprint('analytics', __name__)
 
+# Summary card markup used by generate_corrected_cgge_statement
+_CARD_TMPL = '<div class="summary-card {kind}"><div class="summary-number {kind}">{prefix}{value}{suffix}</div><div class="summary-label">{label}</div></div>'
+
 # Setup logging for analytics
 logger = logging.getLogger(__name__)
 
+# Read buffer for balance history exports (1 MiB instead of the 8 KiB default)
+CSV_READ_BUFFER = 1 << 20
+
+def _parse_iso_date(value):
+    """Parse a YYYY-MM-DD string into a datetime at midnight (C fast path)"""
+    return datetime.fromisoformat(value)
+
 def get_balance_summary(company_id, from_date, to_date):
     """Calculate balance summary dynamically from balance history CSV"""
     from datetime import datetime
@@ -55,8 +65,8 @@ def get_balance_summary(company_id, from_date, to_date):
 
     try:
         # Parse date range
-        from_dt = datetime.strptime(from_date, '%Y-%m-%d')
-        to_dt = datetime.strptime(to_date, '%Y-%m-%d')
+        from_dt = _parse_iso_date(from_date)
+        to_dt = _parse_iso_date(to_date)
 
         starting_balance = 0.0
         period_payouts = 0.0
@@ -64,7 +74,7 @@ def get_balance_summary(company_id, from_date, to_date):
         activity_gross = 0.0  # Payments/charges amount + refunds amount (gross, not net)
         activity_fee = 0.0    # All processing fees
 
-        with open(balance_history_file, 'r', newline='', encoding='utf-8') as f:
+        with open(balance_history_file, 'r', newline='', encoding='utf-8', buffering=CSV_READ_BUFFER) as f:
             reader = csv.DictReader(f)
             for row in reader:
                 # Use Created Date for ALL transaction types (accountant's method)
@@ -75,7 +85,7 @@ def get_balance_summary(company_id, from_date, to_date):
                     continue
 
                 try:
-                    tx_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
+                    tx_date = _parse_iso_date(date_str[:10])
                 except:
                     continue
 
@@ -2017,9 +2027,9 @@ def get_transactions_from_database(company_filter=None, status_filter=None, from
     else:
         # Convert string dates to date objects
         if from_date and isinstance(from_date, str):
-            from_date = datetime.strptime(from_date, '%Y-%m-%d').date()
+            from_date = _parse_iso_date(from_date).date()
         if to_date and isinstance(to_date, str):
-            to_date = datetime.strptime(to_date, '%Y-%m-%d').date()
+            to_date = _parse_iso_date(to_date).date()
     
     try:
         # Use direct SQLite connection to avoid Flask-SQLAlchemy path issues
@@ -2405,11 +2415,16 @@ def generate_statement():
         balance_history_file = os.path.join(data_dir, f'{company_code}_balance_history.csv')
 
         transactions = []
+        # Aggregate status counts and payment totals while reading rows
+        # (single pass, grouped by status) instead of re-scanning the list
+        status_counts = {}
+        total_amount = 0.0
+        total_fees = 0.0
         if os.path.exists(balance_history_file) and from_date and to_date:
-            from_dt = datetime.strptime(from_date, '%Y-%m-%d')
-            to_dt = datetime.strptime(to_date, '%Y-%m-%d')
+            from_dt = _parse_iso_date(from_date)
+            to_dt = _parse_iso_date(to_date)
 
-            with open(balance_history_file, 'r', newline='', encoding='utf-8') as f:
+            with open(balance_history_file, 'r', newline='', encoding='utf-8', buffering=CSV_READ_BUFFER) as f:
                 reader = csv.DictReader(f)
                 for row in reader:
                     tx_type = row.get('Type', '').strip().lower()
@@ -2421,7 +2436,7 @@ def generate_statement():
                         continue
 
                     try:
-                        tx_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
+                        tx_date = _parse_iso_date(date_str[:10])
                     except:
                         continue
 
@@ -2437,6 +2452,12 @@ def generate_statement():
                         # Get customer email from metadata column
                         customer_email = row.get('2. User email (metadata)', '') or row.get('Description', '') or 'N/A'
                         customer_name = row.get('3. User name (metadata)', '')
+                        status = 'succeeded' if net != 0 else 'pending'
+
+                        status_counts[status] = status_counts.get(status, 0) + 1
+                        if tx_type in ['payment', 'charge']:
+                            total_amount += amount
+                            total_fees += fee
 
                         transactions.append({
                             'id': row.get('id', ''),
@@ -2452,20 +2473,10 @@ def generate_statement():
                             'description': row.get('Description', ''),
                             'customer_email': customer_email,
                             'customer_name': customer_name,
-                            'status': 'succeeded' if net != 0 else 'pending',
+                            'status': status,
                             'account_name': 'CGGE',
                         })
 
-        # Calculate totals from transactions
-        total_amount = sum(tx['amount'] for tx in transactions if tx['type'] in ['payment', 'charge'])
-        total_fees = sum(tx['fee'] for tx in transactions if tx['type'] in ['payment', 'charge'])
-
-        # Calculate status counts
-        status_counts = {}
-        for tx in transactions:
-            status = tx.get('status', 'unknown')
-            status_counts[status] = status_counts.get(status, 0) + 1
-
         # Get balance summary for starting/ending balances
         balance_summary = get_balance_summary(company_id, from_date, to_date)
 
@@ -2529,7 +2540,7 @@ def generate_detailed_statement(transactions, status_counts, total_amount, total
     to_date_str = filters.get('to_date', '')
     if from_date_str:
         try:
-            from_dt = datetime.strptime(from_date_str, '%Y-%m-%d')
+            from_dt = _parse_iso_date(from_date_str)
             month_year = from_dt.strftime('%B %Y')
         except:
             month_year = "Statement"
@@ -2908,6 +2919,9 @@ def generate_detailed_statement(transactions, status_counts, total_amount, total
                 table {{ font-size: 0.9rem; }}
                 th, td {{ padding: 8px; }}
             }}
+            body.print-plain *, body.print-plain *::before, body.print-plain *::after {{
+                border-radius: 0 !important; box-shadow: none !important; text-shadow: none !important;
+            }}
         </style>
     </head>
     <body>
@@ -3748,12 +3762,7 @@ def generate_detailed_statement(transactions, status_counts, total_amount, total
                     });
                     
                     // Remove rounded corners and shadows for print
-                    const allElements = document.querySelectorAll('*');
-                    allElements.forEach(el => {
-                        el.style.borderRadius = '0';
-                        el.style.boxShadow = 'none';
-                        el.style.textShadow = 'none';
-                    });
+                    document.body.classList.add('print-plain');
                     
                     // Optimize summary cards for print
                     const summaryCards = document.querySelectorAll('.summary-card');
@@ -3827,16 +3836,6 @@ def generate_detailed_statement(transactions, status_counts, total_amount, total
                     alert('Error optimizing for print. You can still use Ctrl+P to print normally.');
                 }
             }
-                
-                // Remove any remaining rounded corners for print
-                const elements = document.querySelectorAll('*');
-                elements.forEach(el => {
-                    el.style.borderRadius = '0';
-                    el.style.boxShadow = 'none';
-                });
-                
-                alert('Layout optimized for printing. Click OK then use Ctrl+P (or Cmd+P on Mac) to print.');
-            }
             
             // Auto-optimize table for better landscape printing
             document.addEventListener('DOMContentLoaded', function() {
@@ -3910,39 +3909,28 @@ def debug_statement_generation():
         query = db.session.query(
             StripeAccount.name.label('account_name'),
             Transaction.id,
-            Transaction.amount,
+            (func.coalesce(Transaction.amount, 0) / 100.0).label('amount'),
             Transaction.status,
             Transaction.type,
             Transaction.stripe_created,
-            Transaction.description,
-            Transaction.customer_email
+            func.coalesce(func.nullif(Transaction.description, ''), 'N/A').label('description'),
+            func.coalesce(func.nullif(Transaction.customer_email, ''), 'N/A').label('customer_email')
         ).join(Transaction, StripeAccount.id == Transaction.account_id)
         
         # Filter by date range
-        from_datetime = datetime.strptime(from_date, '%Y-%m-%d')
-        to_datetime = datetime.strptime(to_date, '%Y-%m-%d').replace(hour=23, minute=59, second=59)
+        # Half-open range: everything before midnight of the day after to_date
+        from_datetime = _parse_iso_date(from_date)
+        to_datetime = _parse_iso_date(to_date) + timedelta(days=1)
         query = query.filter(
             Transaction.stripe_created >= from_datetime,
-            Transaction.stripe_created <= to_datetime
+            Transaction.stripe_created < to_datetime
         )
         
         # Execute query and get results
         results = query.order_by(Transaction.stripe_created.desc()).all()
         
-        # Process results
-        transactions = []
-        for row in results:
-            amount_hkd = (row.amount or 0) / 100
-            transactions.append({
-                'account_name': row.account_name,
-                'id': row.id,
-                'amount': amount_hkd,
-                'status': row.status,
-                'type': row.type,
-                'stripe_created': row.stripe_created,
-                'description': row.description or 'N/A',
-                'customer_email': row.customer_email or 'N/A'
-            })
+        # Columns are already labelled and defaulted to match the output keys
+        transactions = [row._asdict() for row in results]
         
         # Create debug response
         debug_info = {
@@ -3966,6 +3954,12 @@ def debug_statement_generation():
 
 def generate_corrected_cgge_statement(company_name, date_range, transaction_count, total_amount, total_fees, net_amount, fee_rate, filters):
     """Generate corrected CGGE statement with user-specified figures"""
+    cards = '\n'.join(_CARD_TMPL.format(kind=kind, prefix=prefix, value=value, suffix=suffix, label=label) for kind, prefix, value, suffix, label in (
+        ('gross', 'HK$', f'{total_amount:,.2f}', '', 'Gross Income'),
+        ('fees', 'HK$', f'{total_fees:,.2f}', '', 'Processing Fees'),
+        ('net', 'HK$', f'{net_amount:,.2f}', '', 'Net Income'),
+        ('rate', '', f'{fee_rate:.2f}', '%', 'Fee Rate'),
+    ))
     
     html = f'''
     <!DOCTYPE html>
@@ -4063,22 +4057,7 @@ def generate_corrected_cgge_statement(company_name, date_range, transaction_coun
             </div>
             
             <div class="summary-cards">
-                <div class="summary-card gross">
-                    <div class="summary-number gross">HK${total_amount:,.2f}</div>
-                    <div class="summary-label">Gross Income</div>
-                </div>
-                <div class="summary-card fees">
-                    <div class="summary-number fees">HK${total_fees:,.2f}</div>
-                    <div class="summary-label">Processing Fees</div>
-                </div>
-                <div class="summary-card net">
-                    <div class="summary-number net">HK${net_amount:,.2f}</div>
-                    <div class="summary-label">Net Income</div>
-                </div>
-                <div class="summary-card rate">
-                    <div class="summary-number rate">{fee_rate:.2f}%</div>
-                    <div class="summary-label">Fee Rate</div>
-                </div>
+                {cards}
             </div>
             
             <div style="background: white; padding: 24px; border-radius: 12px; box-shadow: 0 2px 10px rgba(0,0,0,0.08); margin-bottom: 24px;">
@@ -5362,10 +5341,10 @@ def monthly_statement_v2():
 
     transactions = []
     if os.path.exists(balance_history_file):
-        from_dt = datetime.strptime(from_date, '%Y-%m-%d')
-        to_dt = datetime.strptime(to_date, '%Y-%m-%d')
+        from_dt = _parse_iso_date(from_date)
+        to_dt = _parse_iso_date(to_date)
 
-        with open(balance_history_file, 'r', newline='', encoding='utf-8') as f:
+        with open(balance_history_file, 'r', newline='', encoding='utf-8', buffering=CSV_READ_BUFFER) as f:
             reader = csv.DictReader(f)
             for row in reader:
                 tx_type = row.get('Type', '').strip().lower()
@@ -5377,7 +5356,7 @@ def monthly_statement_v2():
                     continue
 
                 try:
-                    tx_date = datetime.strptime(date_str[:10], '%Y-%m-%d')
+                    tx_date = _parse_iso_date(date_str[:10])
                 except:
                     continue
 
@@ -5408,7 +5387,7 @@ def monthly_statement_v2():
 
     # Parse month/year for title
     try:
-        from_dt = datetime.strptime(from_date, '%Y-%m-%d')
+        from_dt = _parse_iso_date(from_date)
         month_year = from_dt.strftime('%B %Y')
         last_day = to_date
     except:
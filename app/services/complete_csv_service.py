@@ -1,17 +1,542 @@
 import os
+import sys
 import csv
-import glob
+import fnmatch
+import heapq
+from bisect import bisect_right
+from calendar import monthrange
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import re
 import logging
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import accumulate, dropwhile, islice
 from decimal import Decimal, ROUND_HALF_UP, InvalidOperation
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa = None
+
+try:
+    import cchardet
+except ImportError:
+    cchardet = None
+
+try:
+    from ciso8601 import parse_datetime as _parse_iso_datetime
+except ImportError:
+    _parse_iso_datetime = datetime.fromisoformat
+
+# Rows per pandas chunk when streaming large CSV exports
+CSV_CHUNK_SIZE = 50000
+
+# Bytes per record batch for PyArrow's streaming CSV reader
+ARROW_BLOCK_SIZE = 8 << 20
+
+# Read buffer for CSV files streamed through the csv module
+CSV_READ_BUFFER = 1 << 20
+
+# Columns read by _build_party_lookup_from_unified, in the order its rows are laid out
+PARTY_COLUMNS = (
+    'Created date (UTC)', 'Converted Amount', 'Amount', 'Status',
+    '3. User name (metadata)', 'Customer Email', 'Customer Description',
+    '4. Product name (metadata)', '1. Site (metadata)', 'site (metadata)',
+    'subs_type (metadata)', 'plan_days (metadata)', '4. Active date (metadata)',
+    '3. Active date (metadata)', '5. Expiry date (metadata)', '4. Expiry date (metadata)',
+    'Currency', 'Fee', 'id', 'Customer ID',
+)
+
+# Payment statuses that count as a sale in the party lookup
+PARTY_STATUSES = ('paid', 'succeeded', 'captured')
+
+# Transaction types that are sales (charge rows carry the gross amount)
+_CHARGE_TYPES = frozenset(('charge', 'payment'))
+
+# Columns read by _parse_unified_row and its metadata helpers
+UNIFIED_COLUMNS = frozenset([
+    'id', 'Status', 'Created date (UTC)', 'Converted Currency', 'Converted Amount', 'Fee',
+    'Amount Refunded', 'Converted Amount Refunded', 'Refunded date (UTC)', 'Description',
+    'Customer Email', 'customer_email', 'email', 'Email', 'customer_email (metadata)',
+    'email (metadata)', '2. User email (metadata)', 'Customer Description', 'userID (metadata)',
+    'site (metadata)', '1. Site (metadata)', 'stripe_plan (metadata)', '4. Product name (metadata)',
+    'webhook_event_type (metadata)', 'type (metadata)',
+])
+
+# Columns read by _parse_balance_history_csv
+BALANCE_HISTORY_COLUMNS = frozenset([
+    'id', 'Source', 'Type', 'Created (UTC)', 'Available On (UTC)', 'Currency', 'Amount', 'Fee',
+    'Net', 'Description', 'Customer Email', 'Customer Facing Amount', 'Customer Facing Currency',
+    '3. User name (metadata)', '1. Site (metadata)', '4. Product name (metadata)',
+    'subs_type (metadata)', 'plan_days (metadata)', '4. Active date (metadata)',
+    '3. Active date (metadata)', '5. Expiry date (metadata)', '4. Expiry date (metadata)',
+])
+
+# Columns read from Stripe's itemised activity and itemised payouts reports
+ITEMISED_ACTIVITY_COLUMNS = frozenset([
+    'balance_transaction_id', 'created', 'available_on', 'currency', 'gross', 'fee', 'net',
+    'reporting_category', 'description',
+])
+ITEMISED_PAYOUT_COLUMNS = frozenset([
+    'payout_id', 'balance_transaction_id', 'effective_at', 'payout_expected_arrival_date',
+    'currency', 'gross', 'fee', 'net', 'payout_status', 'description',
+])
+
+# Lengths of 'YYYY-MM-DD HH:MM' and 'YYYY-MM-DD HH:MM:SS'
+_DATETIME_LENGTHS = (16, 19)
+# Same, plus a bare 'YYYY-MM-DD'
+_DATE_OR_DATETIME_LENGTHS = (10, 16, 19)
+
+
+def _fast_parse_dt(value, lengths=_DATETIME_LENGTHS):
+    """
+    Parse an export timestamp with the ISO parser instead of strptime.
+
+    The length check keeps the accepted shapes to the ones the exports use
+    and avoids raising on empty or obviously different values.
+    Returns None if the value can't be parsed.
+    """
+    if not value or len(value) not in lengths:
+        return None
+    try:
+        return _parse_iso_datetime(value)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=None)
+def _resolve_root_directory(root_csv_path, cwd):
+    """Resolve root directory where unified CSV files may be located (cached per env/cwd)"""
+    possible_paths = [
+        root_csv_path,
+        cwd,
+        os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        '/app',
+    ]
+
+    for path in possible_paths:
+        if path and os.path.exists(path):
+            return path
+
+    return cwd
+
+
+@lru_cache(maxsize=None)
+def _resolve_csv_directory(complete_csv_path, cwd):
+    """Resolve complete_csv directory path (cached per env/cwd)"""
+    logger = logging.getLogger(__name__)
+    possible_paths = [
+        complete_csv_path,
+        os.path.join(cwd, 'complete_csv'),
+        os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'complete_csv'),
+        '/app/complete_csv',
+        '/Users/wongivan/company_apps/stripe-dashboard/complete_csv'
+    ]
+
+    for path in possible_paths:
+        if path and os.path.exists(path):
+            logger.info(f"Found complete_csv directory: {path}")
+            return path
+
+    fallback_path = os.path.join(cwd, 'complete_csv')
+    logger.warning(f"No complete_csv directory found, using fallback: {fallback_path}")
+    return fallback_path
+
+
+# Unified export entries are copied from these templates and the per-row
+# fields filled in. Keys are listed in output order; None marks a per-row field.
+_UNIFIED_GROSS_TEMPLATE = {
+    'id': None, 'stripe_id': None, 'date': None, 'nature': None, 'party': None,
+    'debit': None, 'credit': 0, 'balance': 0, 'acknowledged': False, 'description': None,
+    'gross': None, 'amount': None, 'fee': None, 'net_amount': None, 'currency': 'HKD',
+    'status': 'succeeded', 'type': None, 'created': None, 'available_on': None,
+    'transfer_date': None, 'account_name': None, 'company_code': None,
+    'reporting_category': 'charge',
+}
+_UNIFIED_FEE_TEMPLATE = {
+    'id': None, 'stripe_id': None, 'date': None, 'nature': 'Processing Fee', 'party': 'Stripe',
+    'debit': 0, 'credit': None, 'balance': 0, 'acknowledged': False, 'description': None,
+    'gross': 0, 'amount': None, 'fee': None, 'net_amount': None, 'currency': 'HKD',
+    'status': 'succeeded', 'type': 'fee', 'created': None, 'available_on': None,
+    'transfer_date': None, 'account_name': None, 'company_code': None, 'is_fee': True,
+    'reporting_category': 'fee',
+}
+_UNIFIED_REFUND_TEMPLATE = {
+    'id': None, 'stripe_id': None, 'date': None, 'nature': 'Refund', 'party': None,
+    'debit': 0, 'credit': None, 'balance': 0, 'acknowledged': False, 'description': None,
+    'gross': None, 'amount': None, 'fee': 0, 'net_amount': None, 'currency': 'HKD',
+    'status': 'refunded', 'type': 'refund', 'created': None, 'available_on': None,
+    'transfer_date': None, 'account_name': None, 'company_code': None,
+    'reporting_category': 'refund',
+}
+
+
+# Party references pulled out of transaction descriptions
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+_ORDER_RE = re.compile(r'Order #[A-Z0-9]+')
+# Report period in Stripe export filenames, e.g. ..._2025-11-01_to_2025-11-29_UTC.csv
+_DATE_RANGE_RE = re.compile(r'(\d{4}-\d{2}-\d{2})_to_(\d{4}-\d{2}-\d{2})')
+
+
+def _to_cents(value):
+    """Convert a 2-decimal money amount (float, Decimal or int) to integer cents"""
+    return round(float(value) * 100)
+
+
+class _PartyLookup:
+    """
+    Party records from a unified payments file, keyed by (date, amount).
+
+    Keys are held as integers (date ordinal, amount in cents) so matching is
+    exact rather than float equality. One dict maps each key to its record,
+    so a single hash probe answers both hits and misses.
+    """
+
+    def __init__(self, entries=None):
+        self._entries = dict(entries or {})
+
+    @staticmethod
+    def key(date_value, amount):
+        """Integer lookup key for a date and a money amount"""
+        return date_value.toordinal(), _to_cents(amount)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, date_value, amount):
+        """Return the party record for a date and amount, or None"""
+        if date_value is None or not self._entries:
+            return None
+        try:
+            ordinal, cents = self.key(date_value, amount)
+        except (AttributeError, TypeError, ValueError, OverflowError):
+            return None
+        return self._entries.get((ordinal, cents))
+
+
+@lru_cache(maxsize=8192)
+def _quantize_money(clean_value):
+    """
+    Parse a cleaned money string to a Decimal rounded to cents.
+
+    Cached because exports repeat the same few prices, fees and payout
+    amounts; Decimals are immutable so entries can share them. Invalid
+    values raise (and are not cached).
+    """
+    return Decimal(clean_value).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+
+@lru_cache(maxsize=256)
+def _report_code(value, upper=False):
+    """
+    Normalised (stripped, lower- or upper-cased) and interned form of a
+    report code such as a currency or transaction type. Cached, since these
+    columns hold a handful of distinct values, so each row is one lookup
+    instead of building new strings.
+    """
+    value = value.strip()
+    return sys.intern(value.upper() if upper else value.lower())
+
+
+@lru_cache(maxsize=4096)
+def _strptime(value, fmt):
+    """
+    datetime.strptime, cached on (value, format): Stripe report rows share
+    timestamps (e.g. a payout batch), so repeats skip the parse. Values that
+    don't match raise ValueError (and are not cached).
+    """
+    return datetime.strptime(value, fmt)
+
+
+# Length of the values written in each ISO-shaped report timestamp format
+_ISO_FORMAT_LENGTHS = {
+    '%Y-%m-%d %H:%M:%S': 19,
+    '%Y-%m-%d %H:%M': 16,
+    '%Y-%m-%d': 10,
+}
+
+
+def _strptime_by_length(value, long_fmt, short_fmt):
+    """
+    Parse a report timestamp in long_fmt or short_fmt.
+
+    Values with the length of one of the formats go through the ISO parser
+    (_fast_parse_dt). Anything else is tried with long_fmt first when it has
+    the 19 characters of 'YYYY-MM-DD HH:MM:SS' and short_fmt first
+    otherwise, then with the other format. Returns None if nothing matches.
+    """
+    lengths = (_ISO_FORMAT_LENGTHS[long_fmt], _ISO_FORMAT_LENGTHS[short_fmt])
+    if len(value) in lengths:
+        parsed = _fast_parse_dt(value, lengths)
+        if parsed is not None:
+            return parsed
+    first, second = (long_fmt, short_fmt) if len(value) == 19 else (short_fmt, long_fmt)
+    try:
+        return _strptime(value, first)
+    except ValueError:
+        pass
+    try:
+        return _strptime(value, second)
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def _date_from_string(value):
+    """
+    Date of a serialized timestamp, or None if it isn't one we recognise.
+
+    Handles ISO datetimes ("2025-11-02T12:00:00Z"), ISO dates
+    ("2025-11-02") and HTTP dates ("Sun, 02 Nov 2025 03:19:33 GMT").
+    Cached, since the same timestamps repeat across statement rows.
+    """
+    try:
+        if 'T' in value:
+            return datetime.fromisoformat(value.replace('Z', '+00:00')).date()
+        if value[:4].isdigit():
+            return datetime.strptime(value[:10], '%Y-%m-%d').date()
+        if ',' in value:
+            return datetime.strptime(value, '%a, %d %b %Y %H:%M:%S %Z').date()
+    except ValueError:
+        pass
+    return None
+
+
+def _created_sort_key(tx):
+    """Sort key for imported transactions (undated entries first)"""
+    return tx.get('created') or datetime.min
+
+
+# (root_directory, csv_directory, keep_raw_row) -> (file signature, parsed transactions)
+_TRANSACTION_CACHE = {}
+
+# Same keys -> (parsed transactions, {company_code: (dates, positions)}); see
+# CompleteCsvService._transactions_in_date_range
+_DATE_INDEX_CACHE = {}
+
+# Same keys -> (parsed transactions, {company_code: (dates, cumulative cents)});
+# see CompleteCsvService._closing_balance_on
+_BALANCE_INDEX_CACHE = {}
+
+# (csv file, company_code, file type, keep_raw_row) -> ((mtime, size), parsed and
+# sorted transactions of that file), so a changed file doesn't re-parse the rest
+_FILE_TRANSACTION_CACHE = {}
+
+
+# directory -> (mtime, CSV files listed in it); see _scan_csv_files
+_DIRECTORY_CACHE = {}
+
+# (parser name, file path, parser arguments) -> (file signature, parsed report);
+# see CompleteCsvService._cached_report
+_REPORT_CACHE = {}
+_REPORT_CACHE_SIZE = 256
+
+
+def _file_signature(path):
+    """(mtime, size) of a file, or None if it can't be stat'ed"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _csv_files_signature(csv_files):
+    """(path, mtime, size) of every input file, or None if one can't be stat'ed"""
+    try:
+        signature = []
+        for csv_file, company_code, file_type in csv_files:
+            stat = os.stat(csv_file)
+            signature.append((csv_file, company_code, file_type, stat.st_mtime_ns, stat.st_size))
+        return tuple(signature)
+    except OSError:
+        return None
+
+
+def _running_balance_scan_numpy(delta_cents, transfer_ords, end_ord, exclude_until_ord, seed):
+    """
+    Running balance in cents plus the month-end closing balance.
+
+    The closing balance is the running balance after the last transaction
+    whose transfer date is not in (end_ord, exclude_until_ord].
+    """
+    balances = seed + np.cumsum(delta_cents)
+    included = np.flatnonzero(~((transfer_ords > end_ord) & (transfer_ords <= exclude_until_ord)))
+    closing = int(balances[included[-1]]) if len(included) else seed
+    return balances, closing
+
+
+def _running_balance_scan_loop(delta_cents, transfer_ords, end_ord, exclude_until_ord, seed):
+    """Single-pass form of _running_balance_scan_numpy, compiled with numba.njit"""
+    balances = np.empty(delta_cents.size, np.int64)
+    running = seed
+    closing = seed
+    for i in range(delta_cents.size):
+        running += delta_cents[i]
+        balances[i] = running
+        if not (transfer_ords[i] > end_ord and transfer_ords[i] <= exclude_until_ord):
+            closing = running
+    return balances, closing
+
+
+if njit is not None:
+    _running_balance_scan = njit(cache=True)(_running_balance_scan_loop)
+else:
+    _running_balance_scan = _running_balance_scan_numpy
+
+
+def _sort_by_sort_key(rows):
+    """
+    Stable sort of statement rows by their (datetime, tiebreak) 'sort_key'.
+
+    With NumPy the keys are packed into datetime64/int arrays and ordered
+    with lexsort. Rows NumPy can't convert, or with a missing date, go
+    through list.sort (which raises on a missing date, as before).
+    """
+    if np is not None and rows:
+        try:
+            stamps = np.array([row['sort_key'][0] for row in rows], dtype='datetime64[us]')
+        except (TypeError, ValueError):
+            stamps = None
+        if stamps is not None and not np.isnat(stamps).any():
+            ties = np.fromiter((row['sort_key'][1] for row in rows), dtype=np.int64, count=len(rows))
+            return [rows[i] for i in np.lexsort((ties, stamps)).tolist()]
+    return sorted(rows, key=lambda row: row['sort_key'])
+
+
+def _scan_csv_files(directory):
+    """
+    (path, filename) for visible .csv files in a directory, from a single
+    scandir that is reused until the directory's mtime changes (i.e. until a
+    file is added, removed or renamed)
+    """
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+        cached = _DIRECTORY_CACHE.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        with os.scandir(directory) as entries:
+            files = tuple((entry.path, entry.name) for entry in entries
+                          if entry.name.endswith('.csv') and not entry.name.startswith('.') and entry.is_file())
+    except OSError:
+        return ()
+    _DIRECTORY_CACHE[directory] = (mtime, files)
+    return files
+
+
+def _open_csv(path, encoding='utf-8'):
+    """
+    Open a CSV file for a front-to-back read with a large buffer.
+
+    On platforms that support it the kernel is told the file will be read
+    sequentially so it can read ahead more aggressively.
+    """
+    file = open(path, 'r', newline='', encoding=encoding, buffering=CSV_READ_BUFFER)
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+    return file
+
+
+# Entries from _parse_csv_row are copied from this template (keys in output
+# order); None marks a per-row field.
+_COMPLETE_ENTRY_TEMPLATE = {
+    'id': None, 'stripe_id': None, 'date': None, 'nature': None, 'party': None,
+    'debit': None, 'credit': None, 'balance': 0, 'acknowledged': False, 'description': None,
+    'amount': None, 'fee': None, 'net_amount': None, 'currency': None, 'status': None,
+    'type': None, 'created': None, 'available_on': None, 'transfer_date': None,
+    'account_name': None, 'company_code': None,
+}
+
+# complete_csv row fields kept on each entry under 'raw_row' when the service
+# is created with keep_raw_row=True (CustomerSubscriptionService and the
+# production server read them)
+RAW_ROW_KEYS = (
+    'Customer Email', 'stripe_plan (metadata)', 'plan_days (metadata)',
+    'stripe_user (metadata)', 'userID (metadata)',
+)
+
+# Columns of import_transactions_as_frame (keys shared by every imported transaction)
+FRAME_COLUMNS = [
+    'id', 'stripe_id', 'date', 'nature', 'party', 'debit', 'credit', 'description',
+    'gross', 'amount', 'fee', 'net_amount', 'currency', 'status', 'type', 'created',
+    'available_on', 'transfer_date', 'account_name', 'company_code', 'reporting_category',
+]
+
+
 class CompleteCsvService:
     """Service to import and process complete CSV data for monthly statements"""
 
-    def __init__(self, csv_directory=None):
+    # Company code filename prefix (cgge_sz listed first as it is more specific)
+    _COMPANY_PREFIX_RE = re.compile(r'^(cgge_sz|cgge|ki|kt)_', re.IGNORECASE)
+
+    # Transaction type -> status / nature (see _determine_status and _map_nature)
+    _STATUS_BY_TYPE = {
+        'payment': 'succeeded',
+        'charge': 'succeeded',
+        'refund': 'refunded',
+        'payout': 'succeeded',
+        'payout_failure': 'failed',
+    }
+    _NATURE_BY_TYPE = {
+        'payment': 'Payment',
+        'charge': 'Charge',
+        'refund': 'Refund',
+        'payout': 'Payout',
+    }
+
+    # Balance history Type -> reporting_category (other types map to themselves)
+    _BALANCE_HISTORY_CATEGORIES = {
+        'payment': 'charge',
+        'charge': 'charge',
+        'payment_refund': 'refund',
+        'refund': 'refund',
+        'payout': 'payout',
+    }
+
+    # Balance Summary category -> field of the parsed summary
+    _BALANCE_SUMMARY_FIELDS = {
+        'starting_balance': 'starting_balance',
+        'activity_gross': 'activity_gross',
+        'activity_fee': 'activity_fee',
+        'activity': 'activity_net',
+        'payouts_gross': 'payouts_gross',
+        'payouts_fee': 'payouts_fee',
+        'payouts': 'payouts_net',
+        'ending_balance': 'ending_balance',
+    }
+
+    # Metadata key groups joined into unified payment descriptions
+    _DESC_KEYS = (
+        ('4. Product name (metadata)',),
+        ('1. Site (metadata)', 'site (metadata)'),
+        ('webhook_event_type (metadata)', 'type (metadata)'),
+    )
+
+    def __init__(self, csv_directory=None, keep_raw_row=False):
         self.logger = logging.getLogger(__name__)
+        # Attach the RAW_ROW_KEYS source fields to complete_csv entries
+        self.keep_raw_row = keep_raw_row
 
         if csv_directory is None:
             csv_directory = self._resolve_csv_directory()
@@ -29,37 +554,11 @@ class CompleteCsvService:
 
     def _resolve_root_directory(self):
         """Resolve root directory where unified CSV files may be located"""
-        possible_paths = [
-            os.environ.get('ROOT_CSV_PATH'),
-            os.getcwd(),
-            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-            '/app',
-        ]
-
-        for path in possible_paths:
-            if path and os.path.exists(path):
-                return path
-
-        return os.getcwd()
+        return _resolve_root_directory(os.environ.get('ROOT_CSV_PATH'), os.getcwd())
     
     def _resolve_csv_directory(self):
         """Resolve complete_csv directory path"""
-        possible_paths = [
-            os.environ.get('COMPLETE_CSV_PATH'),
-            os.path.join(os.getcwd(), 'complete_csv'),
-            os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'complete_csv'),
-            '/app/complete_csv',
-            '/Users/wongivan/company_apps/stripe-dashboard/complete_csv'
-        ]
-        
-        for path in possible_paths:
-            if path and os.path.exists(path):
-                self.logger.info(f"Found complete_csv directory: {path}")
-                return path
-        
-        fallback_path = os.path.join(os.getcwd(), 'complete_csv')
-        self.logger.warning(f"No complete_csv directory found, using fallback: {fallback_path}")
-        return fallback_path
+        return _resolve_csv_directory(os.environ.get('COMPLETE_CSV_PATH'), os.getcwd())
     
     def _validate_csv_directory(self):
         """Validate and create CSV directory if needed"""
@@ -75,34 +574,29 @@ class CompleteCsvService:
         csv_files = []
 
         try:
-            # First, look for unified files in root directory (priority)
-            unified_pattern = os.path.join(self.root_directory, "*unified_payments*.csv")
-            unified_files = glob.glob(unified_pattern)
+            root_files = _scan_csv_files(self.root_directory)
 
-            for file_path in unified_files:
-                filename = os.path.basename(file_path)
+            # First, look for unified files in root directory (priority)
+            for file_path, filename in root_files:
+                if 'unified_payments' not in filename[:-4]:
+                    continue
                 company_code = self._extract_company_from_filename(filename)
                 csv_files.append((file_path, company_code, 'unified'))
                 self.logger.info(f"Found unified file: {filename}")
 
             # Look for WeChat trade data files (cgge_sz)
-            wechat_patterns = [
-                os.path.join(self.root_directory, "cgge_sz_*TRADE_DATA*.csv"),
-                os.path.join(self.root_directory, "*MONTH_TRADE_DATA*.csv"),  # WeChat export format
+            wechat_matchers = [
+                lambda name: name.startswith('cgge_sz_') and 'TRADE_DATA' in name[8:-4],
+                lambda name: 'MONTH_TRADE_DATA' in name[:-4],  # WeChat export format
             ]
-            for wechat_pattern in wechat_patterns:
-                wechat_files = glob.glob(wechat_pattern)
-                for file_path in wechat_files:
-                    filename = os.path.basename(file_path)
-                    csv_files.append((file_path, 'cgge_sz', 'wechat'))
-                    self.logger.info(f"Found WeChat file: {filename}")
+            for matches in wechat_matchers:
+                for file_path, filename in root_files:
+                    if matches(filename):
+                        csv_files.append((file_path, 'cgge_sz', 'wechat'))
+                        self.logger.info(f"Found WeChat file: {filename}")
 
             # Then look in complete_csv directory
-            pattern = os.path.join(self.csv_directory, "*.csv")
-            files = glob.glob(pattern)
-
-            for file_path in files:
-                filename = os.path.basename(file_path)
+            for file_path, filename in _scan_csv_files(self.csv_directory):
                 # Skip backup files
                 if '_backup.csv' in filename.lower():
                     continue
@@ -118,91 +612,381 @@ class CompleteCsvService:
     
     def _extract_company_from_filename(self, filename):
         """Extract company code from filename"""
-        filename_lower = filename.lower()
-
-        # Check cgge_sz first (more specific)
-        if filename_lower.startswith('cgge_sz_'):
-            return 'cgge_sz'
-        elif filename_lower.startswith('cgge_'):
-            return 'cgge'
-        elif filename_lower.startswith('ki_'):
-            return 'ki'
-        elif filename_lower.startswith('kt_'):
-            return 'kt'
-        else:
-            return 'unknown'
+        match = self._COMPANY_PREFIX_RE.match(filename)
+        return match.group(1).lower() if match else 'unknown'
     
-    def import_transactions_from_csv(self):
-        """Import all transactions from CSV files (unified files take priority)"""
-        all_transactions = []
+    def import_transactions_from_csv(self, use_parallel=False):
+        """
+        Import all transactions from CSV files (unified files take priority)
+
+        With use_parallel=True each file is parsed in its own worker process;
+        this only pays off for large exports, so it is off by default.
+
+        Parsed transactions are cached per directory pair (and keep_raw_row) until any input
+        file's path, mtime or size changes. Callers get fresh dict copies,
+        so setting e.g. 'balance' on them doesn't leak into the cache.
+        """
+        return [tx.copy() for tx in self._load_transactions(use_parallel)]
+
+    def _load_transactions(self, use_parallel=False):
+        """
+        Parsed transactions for import_transactions_from_csv, from the cache
+        when the input files are unchanged. The list and its dicts are shared
+        with the cache, so callers must not modify them.
+        """
+        per_file_transactions = []
         csv_files = self._find_csv_files()
 
         if not csv_files:
             self.logger.warning("No CSV files found to import")
             return []
 
-        # Track which companies have unified files (they take priority)
-        unified_companies = set()
-
-        # First pass: identify companies with unified files
-        for csv_file_info in csv_files:
-            csv_file, company_code, file_type = csv_file_info
-            if file_type == 'unified':
-                unified_companies.add(company_code)
-
-        # Second pass: import transactions
-        for csv_file_info in csv_files:
-            csv_file, company_code, file_type = csv_file_info
+        cache_key = self._cache_key()
+        signature = _csv_files_signature(csv_files)
+        cached = _TRANSACTION_CACHE.get(cache_key)
+        if signature is not None and cached is not None and cached[0] == signature:
+            return cached[1]
+
+        # Group files by company; unified files take priority over complete_csv files
+        groups = {}
+        for csv_file, company_code, file_type in csv_files:
+            groups.setdefault(company_code, {'unified': [], 'wechat': [], 'complete': []})[file_type].append(csv_file)
+
+        readers = {
+            'unified': self._read_unified_csv_file,
+            'wechat': self._read_wechat_csv_file,
+            'complete': self._read_csv_file,
+        }
 
-            # Skip complete_csv files if we have unified file for this company
-            if file_type == 'complete' and company_code in unified_companies:
-                self.logger.info(f"Skipping {os.path.basename(csv_file)} (unified file takes priority)")
-                continue
+        jobs = []
+        for company_code, files in groups.items():
+            if files['unified']:
+                for csv_file in files['complete']:
+                    self.logger.info(f"Skipping {os.path.basename(csv_file)} (unified file takes priority)")
+                file_types = ('unified', 'wechat')
+            else:
+                file_types = ('wechat', 'complete')
+
+            for file_type in file_types:
+                for csv_file in files[file_type]:
+                    jobs.append((readers[file_type], csv_file, company_code, file_type))
+
+        # Files that are unchanged since they were last parsed are reused as they are
+        stamps = {entry[0]: entry[3:] for entry in signature} if signature is not None else {}
+        reused = {}
+        for index, (reader, csv_file, company_code, file_type) in enumerate(jobs):
+            cached_file = _FILE_TRANSACTION_CACHE.get((csv_file, company_code, file_type, self.keep_raw_row))
+            if cached_file is not None and csv_file in stamps and cached_file[0] == stamps[csv_file]:
+                reused[index] = cached_file[1]
+
+        executor = None
+        pending = [index for index in range(len(jobs)) if index not in reused]
+        if use_parallel and len(pending) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(len(pending), os.cpu_count() or 1))
+            results = {index: executor.submit(jobs[index][0], jobs[index][1], jobs[index][2]) for index in pending}
 
-            try:
-                if file_type == 'unified':
-                    transactions = self._read_unified_csv_file(csv_file, company_code)
-                elif file_type == 'wechat':
-                    transactions = self._read_wechat_csv_file(csv_file, company_code)
-                else:
-                    transactions = self._read_csv_file(csv_file, company_code)
-                all_transactions.extend(transactions)
-                self.logger.info(f"Imported {len(transactions)} transactions from {os.path.basename(csv_file)}")
-            except Exception as e:
-                self.logger.error(f"Error reading {csv_file}: {e}")
-                continue
+        try:
+            # Results are collected in job order so ties keep the serial ordering
+            for index, (reader, csv_file, company_code, file_type) in enumerate(jobs):
+                if index in reused:
+                    per_file_transactions.append(reused[index])
+                    self.logger.info(f"Reused {len(reused[index])} transactions from {os.path.basename(csv_file)}")
+                    continue
+                try:
+                    transactions = results[index].result() if executor else reader(csv_file, company_code)
+                    # Exports are already (near-)chronological, so this is close to linear
+                    transactions.sort(key=_created_sort_key)
+                    per_file_transactions.append(transactions)
+                    if csv_file in stamps:
+                        _FILE_TRANSACTION_CACHE[(csv_file, company_code, file_type, self.keep_raw_row)] = (
+                            stamps[csv_file], transactions)
+                    self.logger.info(f"Imported {len(transactions)} transactions from {os.path.basename(csv_file)}")
+                except Exception as e:
+                    self.logger.error(f"Error reading {csv_file}: {e}")
+                    continue
+        finally:
+            if executor:
+                executor.shutdown()
 
-        # Sort by created date
-        all_transactions.sort(key=lambda x: x.get('created') or datetime.min)
+        # Merge the per-file runs by created date (stable, like a full sort)
+        all_transactions = list(heapq.merge(*per_file_transactions, key=_created_sort_key))
 
         self.logger.info(f"Total imported transactions: {len(all_transactions)}")
+        if signature is not None:
+            _TRANSACTION_CACHE[cache_key] = (signature, all_transactions)
         return all_transactions
 
+    def _cache_key(self):
+        """Key of this service's entries in the module-level import caches"""
+        return (self.root_directory, self.csv_directory, self.keep_raw_row)
+
+    def _find_root_files(self, pattern):
+        """Paths of CSV files in the root directory whose names match a glob pattern"""
+        return [path for path, filename in _scan_csv_files(self.root_directory)
+                if fnmatch.fnmatchcase(filename, pattern)]
+
+    def _cached_report(self, parser, file_path, *args):
+        """
+        parser(file_path, *args), reused while the file is unchanged. Statement
+        and balance summary runs for the same month read the same Stripe
+        reports, so each is parsed once. The result is shared with the cache
+        and must not be modified.
+        """
+        cache_key = (parser.__name__, file_path, args)
+        signature = _file_signature(file_path)
+        cached = _REPORT_CACHE.get(cache_key)
+        if signature is not None and cached is not None and cached[0] == signature:
+            return cached[1]
+
+        report = parser(file_path, *args)
+        if signature is not None:
+            if len(_REPORT_CACHE) >= _REPORT_CACHE_SIZE:
+                # Drop the oldest entry (dicts keep insertion order)
+                del _REPORT_CACHE[next(iter(_REPORT_CACHE))]
+            _REPORT_CACHE[cache_key] = (signature, report)
+        return report
+
+    def _transactions_in_date_range(self, company_filter, after_date, end_date):
+        """
+        Imported transactions with after_date < date <= end_date (for one
+        company, or all when company_filter is empty), in import order.
+
+        Uses a per-company date index built once per import, so a short window
+        is two bisects instead of a scan of every transaction. The returned
+        dicts are shared with the import cache and must not be modified.
+        """
+        transactions = self._load_transactions()
+        cache_key = self._cache_key()
+        cached = _DATE_INDEX_CACHE.get(cache_key)
+        if cached is None or cached[0] is not transactions:
+            cached = (transactions, {})
+            _DATE_INDEX_CACHE[cache_key] = cached
+        index = cached[1]
+
+        company_key = company_filter or None
+        if company_key not in index:
+            # Stable sort keeps import order among transactions on the same date
+            dated = sorted(
+                ((tx['date'], position) for position, tx in enumerate(transactions)
+                 if tx['date'] and (company_key is None or tx['company_code'] == company_key)),
+                key=lambda item: item[0])
+            index[company_key] = ([d for d, _ in dated], [p for _, p in dated])
+        dates, positions = index[company_key]
+
+        window = positions[bisect_right(dates, after_date):bisect_right(dates, end_date)]
+        return [transactions[position] for position in sorted(window)]
+
+    def _closing_balance_on(self, company_filter, target_date):
+        """
+        Balance in integer cents of all transactions dated up to target_date
+        (for one company, or all when company_filter is empty).
+
+        Debits increase the balance and credits decrease it. Cumulative
+        balances are built once per import and company, so each month's
+        opening balance is a bisect. As before, a company with any undated
+        transaction has no balance history (0).
+        """
+        transactions = self._load_transactions()
+        cache_key = self._cache_key()
+        cached = _BALANCE_INDEX_CACHE.get(cache_key)
+        if cached is None or cached[0] is not transactions:
+            cached = (transactions, {})
+            _BALANCE_INDEX_CACHE[cache_key] = cached
+        index = cached[1]
+
+        company_key = company_filter or None
+        if company_key not in index:
+            selected = [tx for tx in transactions if company_key is None or tx['company_code'] == company_key]
+            if any(not tx['date'] for tx in selected):
+                index[company_key] = ([], [])
+            else:
+                selected.sort(key=lambda tx: tx['date'])
+                index[company_key] = (
+                    [tx['date'] for tx in selected],
+                    list(accumulate(_to_cents(tx['debit']) - _to_cents(tx['credit']) for tx in selected)))
+        dates, cumulative = index[company_key]
+
+        count = bisect_right(dates, target_date)
+        return cumulative[count - 1] if count else 0
+
+    def import_transactions_as_frame(self):
+        """
+        Import all transactions as a column-oriented pandas DataFrame.
+
+        Same rows and order as import_transactions_from_csv, but amounts are
+        float columns and created is a datetime64 column, so reports can sum
+        and filter by company/date with vectorized operations instead of
+        walking a list of dicts. Requires pandas.
+        """
+        if pd is None:
+            raise ImportError("pandas is required for import_transactions_as_frame")
+
+        df = pd.DataFrame.from_records(self._load_transactions(), columns=FRAME_COLUMNS)
+        for column in ('debit', 'credit', 'gross', 'amount', 'fee', 'net_amount'):
+            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0.0)
+        df['created'] = pd.to_datetime(df['created'])
+        return df
+
     def _read_unified_csv_file(self, csv_file, company_code):
         """Read and parse unified payments CSV file (matches Stripe reports)"""
         transactions = []
 
         try:
-            with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+            if pd is not None:
+                for chunk in self._iter_csv_chunks(csv_file, UNIFIED_COLUMNS):
+                    transactions.extend(self._parse_unified_chunk(chunk, company_code, csv_file))
+                return transactions
 
-                for row in reader:
-                    try:
-                        parsed = self._parse_unified_row(row, company_code)
-                        if parsed:
-                            if isinstance(parsed, list):
-                                transactions.extend(parsed)
-                            else:
-                                transactions.append(parsed)
-                    except Exception as e:
-                        self.logger.warning(f"Error parsing row in {csv_file}: {e}")
-                        continue
+            for row in self._iter_unified_rows(csv_file):
+                try:
+                    parsed = self._parse_unified_row(row, company_code)
+                    if parsed:
+                        if isinstance(parsed, list):
+                            transactions.extend(parsed)
+                        else:
+                            transactions.append(parsed)
+                except Exception as e:
+                    self.logger.warning(f"Error parsing row in {csv_file}: {e}")
+                    continue
 
         except Exception as e:
             self.logger.error(f"Error reading unified CSV file {csv_file}: {e}")
 
         return transactions
 
+    def _iter_unified_rows(self, csv_file):
+        """
+        Yield Paid/Refunded rows of a unified export as dicts of the columns we use.
+
+        Column positions are looked up once from the header and rows are read
+        as plain lists, so the Status check happens before any dict is built
+        and only UNIFIED_COLUMNS end up in the dicts.
+        """
+        with _open_csv(csv_file) as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if not header:
+                return
+
+            columns = [(name, index) for index, name in enumerate(header) if name in UNIFIED_COLUMNS]
+            status_index = dict(columns).get('Status')
+            if status_index is None:
+                return
+
+            for values in reader:
+                if len(values) < len(header):
+                    # Skip blank lines and pad short rows with '', like read_csv
+                    if not values:
+                        continue
+                    values = values + [''] * (len(header) - len(values))
+                if (values[status_index] or '').strip().lower() not in ('paid', 'refunded'):
+                    continue
+                yield {name: values[index] for name, index in columns}
+
+    def _iter_csv_chunks(self, csv_file, columns=None):
+        """
+        Yield pandas DataFrame chunks of string columns (empty cells as '').
+
+        Chunks come from PyArrow's streaming reader when it is installed,
+        otherwise from pandas' C parser with memory_map=True, so the
+        tokenizer reads straight from the page cache instead of through
+        Python file buffers.
+        """
+        if pa is not None:
+            return self._iter_arrow_chunks(csv_file, columns)
+        return self._iter_pandas_chunks(csv_file, columns)
+
+    def _iter_pandas_chunks(self, csv_file, columns=None):
+        """Yield _iter_csv_chunks' chunks from pandas' C parser"""
+        usecols = (lambda name: name in columns) if columns else None
+        return pd.read_csv(csv_file, dtype=str, usecols=usecols, na_filter=False,
+                           chunksize=CSV_CHUNK_SIZE, engine='c', encoding='utf-8',
+                           memory_map=True)
+
+    def _iter_arrow_chunks(self, csv_file, columns=None):
+        """
+        Yield DataFrame chunks from PyArrow's streaming CSV reader.
+
+        Parsing runs in Arrow's C++ thread pool, one record batch at a time.
+        Every column is read as a non-null string so chunks look the same
+        as the read_csv ones. Arrow rejects short or ragged rows, which
+        read_csv pads; if it does, the rest of the file (from the first row
+        not yet yielded) is read with pandas instead.
+        """
+        with open(csv_file, 'r', newline='', encoding='utf-8-sig') as file:
+            header = next(csv.reader(file), [])
+        names = [name for name in header if not columns or name in columns]
+        if not names:
+            return
+
+        rows_read = 0
+        try:
+            reader = pa_csv.open_csv(
+                csv_file,
+                read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE, use_threads=True),
+                # Descriptions can hold quoted newlines
+                parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=names,
+                    column_types={name: pa.string() for name in names},
+                    strings_can_be_null=False,
+                ),
+            )
+            for batch in reader:
+                rows_read += batch.num_rows
+                yield batch.to_pandas()
+            return
+        except pa.ArrowInvalid as e:
+            self.logger.warning(f"Arrow could not read {csv_file}, using pandas: {e}")
+
+        for chunk in self._iter_pandas_chunks(csv_file, columns):
+            if rows_read >= len(chunk):
+                rows_read -= len(chunk)
+                continue
+            if rows_read:
+                chunk = chunk.iloc[rows_read:]
+                rows_read = 0
+            yield chunk
+
+    def _iter_csv_rows(self, csv_file, columns=None, required=None):
+        """
+        Yield CSV rows as dicts of strings.
+
+        Uses pandas' C parser in chunks when pandas is installed, otherwise
+        the csv module. Empty cells, and cells missing from short rows, are
+        '' in both cases so row parsers see the same values. If columns is given, only those
+        columns are read (without pandas, their positions are looked up
+        once from the header and each row is indexed directly, instead of
+        building a dict of every column). With pandas, rows whose required
+        column is blank are dropped per chunk before any dicts are built;
+        the caller still checks the rows it gets.
+        """
+        if pd is None:
+            with _open_csv(csv_file) as file:
+                if not columns:
+                    yield from csv.DictReader(file, restval='')
+                    return
+
+                reader = csv.reader(file)
+                header = next(reader, None)
+                if not header:
+                    return
+                selected = [(name, index) for index, name in enumerate(header) if name in columns]
+                width = len(header)
+                for values in reader:
+                    if len(values) < width:
+                        # Skip blank lines and pad short rows with '', like read_csv
+                        if not values:
+                            continue
+                        values = values + [''] * (width - len(values))
+                    yield {name: values[index] for name, index in selected}
+            return
+
+        for chunk in self._iter_csv_chunks(csv_file, columns):
+            if required is not None and required in chunk:
+                chunk = chunk[chunk[required].str.strip() != '']
+            yield from chunk.to_dict(orient='records')
+
     def _read_wechat_csv_file(self, csv_file, company_code):
         """
         Read and parse WeChat trade data CSV file (GB2312 encoded, Chinese format).
@@ -217,116 +1001,138 @@ class CompleteCsvService:
         transactions = []
 
         try:
-            # Read file with GB2312 encoding (common for WeChat exports)
+            # Only the head of the file is read up front for encoding sniffing;
+            # the file itself is decoded line by line
             with open(csv_file, 'rb') as f:
-                content = f.read()
+                head = f.read(65536)
 
-            # Try different encodings
-            decoded_content = None
-            for encoding in ['gb2312', 'gbk', 'gb18030', 'utf-8']:
+            # Try the sniffed encoding first, then the usual WeChat encodings (GB2312 is common)
+            for encoding in self._wechat_encodings(head):
                 try:
-                    decoded_content = content.decode(encoding)
+                    with _open_csv(csv_file, encoding) as f:
+                        transactions = self._parse_wechat_lines(f, csv_file, company_code)
                     self.logger.info(f"WeChat file decoded with {encoding}")
                     break
                 except (UnicodeDecodeError, LookupError):
                     continue
-
-            if not decoded_content:
+            else:
                 self.logger.error(f"Could not decode WeChat file {csv_file}")
                 return []
 
-            lines = decoded_content.strip().split('\n')
-            if len(lines) < 5:
-                self.logger.warning(f"WeChat file {csv_file} has too few lines")
-                return []
+            self.logger.info(f"Parsed {len(transactions)} monthly entries from WeChat file")
 
-            # Parse monthly data (starting from line 5, index 4)
-            for i, line in enumerate(lines[4:], start=5):
-                line = line.strip()
-                if not line:
-                    continue
+        except Exception as e:
+            self.logger.error(f"Error reading WeChat CSV file {csv_file}: {e}")
 
-                # Parse: YYYY-MM,"amount","count","avg"
-                # Use csv module to properly handle quoted fields with commas
-                import io
-                reader = csv.reader(io.StringIO(line))
-                try:
-                    parts = next(reader)
-                except StopIteration:
-                    continue
+        return transactions
 
-                if len(parts) < 3:
-                    continue
+    def _parse_wechat_lines(self, file, csv_file, company_code):
+        """Parse the monthly rows of a decoded WeChat export (see _read_wechat_csv_file)"""
+        transactions = []
 
-                month_str = parts[0].strip()
-                amount_str = parts[1].strip().replace(',', '')  # Remove thousands separator
-                count_str = parts[2].strip()
+        # Skip leading blank lines, then the four header lines
+        lines = dropwhile(lambda line: not line, (line.strip() for line in file))
+        if len(list(islice(lines, 4))) < 4:
+            self.logger.warning(f"WeChat file {csv_file} has too few lines")
+            return []
 
-                # Parse month (YYYY-MM)
-                try:
-                    year_month = datetime.strptime(month_str, '%Y-%m')
-                except ValueError:
-                    self.logger.warning(f"Could not parse month: {month_str}")
-                    continue
+        # Parse monthly data (starting from line 5, index 4)
+        # Parse: YYYY-MM,"amount","count","avg"
+        # Use csv module to properly handle quoted fields with commas
+        reader = csv.reader(lines)
+        for parts in reader:
+            # Blank lines come back as []
+            if len(parts) < 3:
+                continue
 
-                # Parse amount (in CNY/RMB)
-                try:
-                    amount = Decimal(amount_str)
-                except (InvalidOperation, ValueError):
-                    self.logger.warning(f"Could not parse amount: {amount_str}")
-                    continue
+            month_str = parts[0].strip()
+            amount_str = parts[1].strip().replace(',', '')  # Remove thousands separator
+            count_str = parts[2].strip()
 
-                # Parse transaction count
-                try:
-                    tx_count = int(count_str)
-                except ValueError:
-                    tx_count = 1
+            # Parse month (YYYY-MM)
+            year_month = _fast_parse_dt(month_str + '-01', (10,)) if len(month_str) == 7 else None
+            if not year_month:
+                self.logger.warning(f"Could not parse month: {month_str}")
+                continue
 
-                # Skip zero amounts
-                if amount <= 0:
-                    continue
+            # Parse amount (in CNY/RMB)
+            try:
+                amount = Decimal(amount_str)
+            except (InvalidOperation, ValueError):
+                self.logger.warning(f"Could not parse amount: {amount_str}")
+                continue
 
-                # Create a monthly summary transaction
-                # Note: WeChat data is monthly summary, not individual transactions
-                # We'll create one transaction per month representing total sales
-                tx_date = year_month.date()
-                last_day = self._get_last_day_of_month(year_month.year, year_month.month)
-                tx_date = datetime(year_month.year, year_month.month, last_day).date()
+            # Parse transaction count
+            try:
+                tx_count = int(count_str)
+            except ValueError:
+                tx_count = 1
 
-                transactions.append({
-                    'id': f"wechat_{company_code}_{month_str}",
-                    'stripe_id': f"wechat_{month_str}",
-                    'date': tx_date,
-                    'nature': 'WeChat Sales',
-                    'party': 'WeChat Customers',
-                    'debit': float(amount),  # Income increases balance
-                    'credit': 0,
-                    'balance': 0,
-                    'acknowledged': False,
-                    'description': f"WeChat sales for {month_str} ({tx_count} transactions)",
-                    'gross': float(amount),
-                    'amount': float(amount),
-                    'fee': 0,  # WeChat fees are typically handled separately
-                    'net_amount': float(amount),
-                    'currency': 'CNY',
-                    'status': 'succeeded',
-                    'type': 'wechat_payment',
-                    'created': datetime.combine(tx_date, datetime.min.time()),
-                    'available_on': tx_date,
-                    'transfer_date': tx_date,
-                    'account_name': self.company_names.get(company_code, 'CGGE (Shenzhen)'),
-                    'company_code': company_code,
-                    'reporting_category': 'wechat_sales',
-                    'transaction_count': tx_count
-                })
+            # Skip zero amounts
+            if amount <= 0:
+                continue
 
-            self.logger.info(f"Parsed {len(transactions)} monthly entries from WeChat file")
+            # Create a monthly summary transaction
+            # Note: WeChat data is monthly summary, not individual transactions
+            # We'll create one transaction per month representing total sales
+            tx_date = year_month.date()
+            last_day = self._get_last_day_of_month(year_month.year, year_month.month)
+            tx_date = datetime(year_month.year, year_month.month, last_day).date()
+
+            transactions.append({
+                'id': f"wechat_{company_code}_{month_str}",
+                'stripe_id': f"wechat_{month_str}",
+                'date': tx_date,
+                'nature': 'WeChat Sales',
+                'party': 'WeChat Customers',
+                'debit': float(amount),  # Income increases balance
+                'credit': 0,
+                'balance': 0,
+                'acknowledged': False,
+                'description': f"WeChat sales for {month_str} ({tx_count} transactions)",
+                'gross': float(amount),
+                'amount': float(amount),
+                'fee': 0,  # WeChat fees are typically handled separately
+                'net_amount': float(amount),
+                'currency': 'CNY',
+                'status': 'succeeded',
+                'type': 'wechat_payment',
+                'created': datetime.combine(tx_date, datetime.min.time()),
+                'available_on': tx_date,
+                'transfer_date': tx_date,
+                'account_name': self.company_names.get(company_code, 'CGGE (Shenzhen)'),
+                'company_code': company_code,
+                'reporting_category': 'wechat_sales',
+                'transaction_count': tx_count
+            })
 
-        except Exception as e:
-            self.logger.error(f"Error reading WeChat CSV file {csv_file}: {e}")
+        if reader.line_num == 0:
+            self.logger.warning(f"WeChat file {csv_file} has too few lines")
 
         return transactions
 
+    def _wechat_encodings(self, content):
+        """
+        Candidate encodings for a WeChat export, most likely first.
+
+        With cchardet installed, the first 64KB are sniffed so the file is
+        usually decoded in one pass. GB2312/GBK guesses map to GB18030,
+        which is a superset of both.
+        """
+        encodings = ['gb2312', 'gbk', 'gb18030', 'utf-8']
+        if cchardet is None:
+            return encodings
+
+        detected = (cchardet.detect(content[:65536]).get('encoding') or '').lower()
+        if detected in ('gb2312', 'gbk', 'gb18030'):
+            detected = 'gb18030'
+        elif detected in ('ascii', 'utf-8-sig'):
+            detected = 'utf-8'
+        if detected in encodings:
+            encodings.remove(detected)
+            encodings.insert(0, detected)
+        return encodings
+
     def _parse_unified_row(self, row, company_code):
         """Parse unified payments CSV row - only include Paid/Refunded transactions"""
         try:
@@ -340,271 +1146,277 @@ class CompleteCsvService:
             if not tx_id:
                 return None
 
-            # Parse created date
-            created_str = row.get('Created date (UTC)', '').strip()
-            created = None
-            if created_str:
-                try:
-                    created = datetime.strptime(created_str, '%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    try:
-                        created = datetime.strptime(created_str, '%Y-%m-%d %H:%M')
-                    except ValueError:
-                        pass
-
+            created = self._parse_unified_datetime(row.get('Created date (UTC)', ''))
             if not created:
                 return None
 
             # Use Converted Amount (HKD) as gross - this matches Stripe's balance reports
-            converted_currency = row.get('Converted Currency', '').strip().lower()
-            if converted_currency == 'hkd':
-                gross = self._parse_decimal(row.get('Converted Amount', '0'))
-            else:
-                # If not HKD, still use converted amount but log it
-                gross = self._parse_decimal(row.get('Converted Amount', '0'))
+            gross = self._parse_money(row.get('Converted Amount', '0'))
+            fee = self._parse_money(row.get('Fee', '0'))
+            converted_refunded = self._parse_money(row.get('Converted Amount Refunded', '0'))
+            refund_date = self._parse_unified_datetime(row.get('Refunded date (UTC)', ''))
 
-            fee = self._parse_decimal(row.get('Fee', '0'))
-            net = gross - fee
-
-            # Handle refunds - check Amount Refunded and Converted Amount Refunded
-            amount_refunded = self._parse_decimal(row.get('Amount Refunded', '0'))
-            converted_refunded = self._parse_decimal(row.get('Converted Amount Refunded', '0'))
-            refunded_date_str = row.get('Refunded date (UTC)', '').strip()
-
-            # Determine party (customer email)
-            party = row.get('Customer Email', '').strip()
-            if not party or party == '':
-                party = self._extract_party_from_metadata(row) or 'N/A'
-
-            # Get description from metadata
-            description = self._build_description_from_metadata(row)
-
-            # Determine transaction type from ID prefix
-            if tx_id.startswith('ch_'):
-                tx_type = 'charge'
-            elif tx_id.startswith('py_'):
-                tx_type = 'payment'
-            elif tx_id.startswith('re_'):
-                tx_type = 'refund'
-            else:
-                tx_type = 'payment'
-
-            transactions = []
-
-            # Create the main charge/payment transaction
-            if gross > 0:
-                # Gross entry (debit - increases balance)
-                gross_tx = {
-                    'id': tx_id + '_gross',
-                    'stripe_id': tx_id,
-                    'date': created.date(),
-                    'nature': 'Charge' if tx_type == 'charge' else 'Payment',
-                    'party': party,
-                    'debit': float(gross),
-                    'credit': 0,
-                    'balance': 0,
-                    'acknowledged': False,
-                    'description': description,
-                    'gross': float(gross),
-                    'amount': float(gross),
-                    'fee': float(fee),
-                    'net_amount': float(net),
-                    'currency': 'HKD',
-                    'status': 'succeeded',
-                    'type': tx_type,
-                    'created': created,
-                    'available_on': created.date(),
-                    'transfer_date': (created + timedelta(days=6)).date(),  # Stripe ~6 days to payout
-                    'account_name': self.company_names.get(company_code, 'Unknown Company'),
-                    'company_code': company_code,
-                    'reporting_category': 'charge'
-                }
-                transactions.append(gross_tx)
-
-                # Fee entry (credit - decreases balance)
-                if fee > 0:
-                    fee_tx = {
-                        'id': tx_id + '_fee',
-                        'stripe_id': tx_id,
-                        'date': created.date(),
-                        'nature': 'Processing Fee',
-                        'party': 'Stripe',
-                        'debit': 0,
-                        'credit': float(fee),
-                        'balance': 0,
-                        'acknowledged': False,
-                        'description': f"Fee for {description}",
-                        'gross': 0,
-                        'amount': float(-fee),
-                        'fee': float(fee),
-                        'net_amount': float(-fee),
-                        'currency': 'HKD',
-                        'status': 'succeeded',
-                        'type': 'fee',
-                        'created': created,
-                        'available_on': created.date(),
-                        'transfer_date': (created + timedelta(days=6)).date(),
-                        'account_name': self.company_names.get(company_code, 'Unknown Company'),
-                        'company_code': company_code,
-                        'is_fee': True,
-                        'reporting_category': 'fee'
-                    }
-                    transactions.append(fee_tx)
-
-            # Handle refund if this payment was refunded
-            if converted_refunded > 0 and refunded_date_str:
-                refund_date = None
-                try:
-                    refund_date = datetime.strptime(refunded_date_str, '%Y-%m-%d %H:%M:%S')
-                except ValueError:
-                    try:
-                        refund_date = datetime.strptime(refunded_date_str, '%Y-%m-%d %H:%M')
-                    except ValueError:
-                        pass
-
-                if refund_date:
-                    # Refund reduces balance (negative gross, positive fee for refund processing)
-                    # Stripe charges a fee on refunds (typically same as original fee proportion)
-                    refund_fee = self._parse_decimal(row.get('Fee', '0'))  # Approximate refund fee
-
-                    # Refund gross entry (credit - decreases balance)
-                    refund_tx = {
-                        'id': tx_id + '_refund',
-                        'stripe_id': tx_id,
-                        'date': refund_date.date(),
-                        'nature': 'Refund',
-                        'party': party,
-                        'debit': 0,
-                        'credit': float(converted_refunded),
-                        'balance': 0,
-                        'acknowledged': False,
-                        'description': f"Refund for {description}",
-                        'gross': float(-converted_refunded),
-                        'amount': float(-converted_refunded),
-                        'fee': 0,
-                        'net_amount': float(-converted_refunded),
-                        'currency': 'HKD',
-                        'status': 'refunded',
-                        'type': 'refund',
-                        'created': refund_date,
-                        'available_on': refund_date.date(),
-                        'transfer_date': (refund_date + timedelta(days=2)).date(),
-                        'account_name': self.company_names.get(company_code, 'Unknown Company'),
-                        'company_code': company_code,
-                        'reporting_category': 'refund'
-                    }
-                    transactions.append(refund_tx)
-
-            return transactions if transactions else None
+            return self._build_unified_transactions(row, tx_id, created, gross, fee, converted_refunded,
+                                                    refund_date, company_code)
 
         except Exception as e:
             self.logger.error(f"Error parsing unified row: {e}")
             return None
 
-    def _build_description_from_metadata(self, row):
-        """Build description from metadata fields"""
-        parts = []
+    def _parse_unified_datetime(self, value):
+        """Parse a unified export timestamp ('%Y-%m-%d %H:%M:%S' or '%Y-%m-%d %H:%M')"""
+        return _fast_parse_dt(value.strip())
 
-        # Product name
-        product = row.get('4. Product name (metadata)', '').strip()
-        if product:
-            parts.append(product)
+    def _parse_unified_chunk(self, df, company_code, csv_file=None):
+        """
+        Parse a DataFrame chunk of the unified payments export.
+
+        Status/id filtering, timestamp parsing and money conversion run as
+        vectorized pandas operations; only the surviving Paid/Refunded rows
+        are walked in Python to build the transaction dicts.
+        """
+        missing = [name for name in UNIFIED_COLUMNS if name not in df.columns]
+        if missing:
+            df = df.assign(**{name: '' for name in missing})
+
+        # Only include Paid or Refunded, and skip incomplete records without an ID
+        df = df[df['Status'].str.strip().str.lower().isin(['paid', 'refunded'])]
+        tx_ids = df['id'].str.strip()
+        df = df[tx_ids != '']
+        if df.empty:
+            return []
 
-        # Site
-        site = row.get('1. Site (metadata)', '').strip() or row.get('site (metadata)', '').strip()
-        if site and site not in parts:
-            parts.append(site)
+        created = self._to_datetime_series(df['Created date (UTC)'])
+        df = df[created.notna()]
+        created = created[created.notna()]
 
-        # Type (subscription, donation, etc.)
-        tx_type = row.get('webhook_event_type (metadata)', '').strip() or row.get('type (metadata)', '').strip()
-        if tx_type:
-            parts.append(tx_type)
+        gross = self._to_money_series(df['Converted Amount'])
+        fee = self._to_money_series(df['Fee'])
+        converted_refunded = self._to_money_series(df['Converted Amount Refunded'])
+        refund_dates = self._to_datetime_series(df['Refunded date (UTC)'])
 
-        if parts:
-            return ' - '.join(parts)
+        # Calendar dates and estimated payout dates for the whole chunk at once
+        created_dates = created.dt.date
+        transfer_dates = (created + pd.Timedelta(days=6)).dt.date
+        refund_days = refund_dates.dt.date
+        refund_transfer_dates = (refund_dates + pd.Timedelta(days=2)).dt.date
+
+        transactions = []
+        rows = zip(df.to_dict(orient='records'), df['id'].str.strip(), created, gross, fee,
+                   converted_refunded, refund_dates, created_dates, transfer_dates, refund_days,
+                   refund_transfer_dates)
+        for (row, tx_id, created_at, gross_amt, fee_amt, refunded_amt, refund_date,
+             created_date, transfer_date, refund_day, refund_transfer_date) in rows:
+            try:
+                parsed = self._build_unified_transactions(
+                    row, tx_id, created_at.to_pydatetime(), gross_amt, fee_amt, refunded_amt,
+                    None if pd.isna(refund_date) else refund_date.to_pydatetime(), company_code,
+                    created_date=created_date, transfer_date=transfer_date,
+                    refund_day=refund_day, refund_transfer_date=refund_transfer_date)
+                if parsed:
+                    transactions.extend(parsed)
+            except Exception as e:
+                self.logger.warning(f"Error parsing row in {csv_file}: {e}")
+
+        return transactions
+
+    @staticmethod
+    def _to_datetime_series(values):
+        """Vectorized form of _parse_unified_datetime (unparseable values become NaT)"""
+        values = values.str.strip()
+        parsed = pd.to_datetime(values, format='%Y-%m-%d %H:%M:%S', errors='coerce')
+        return parsed.fillna(pd.to_datetime(values, format='%Y-%m-%d %H:%M', errors='coerce'))
+
+    @staticmethod
+    def _to_money_series(values):
+        """Vectorized form of _parse_money (unparseable or empty values become 0.0)"""
+        return pd.to_numeric(values.str.replace(',', '', regex=False).str.strip(), errors='coerce').fillna(0.0)
+
+    def _build_unified_transactions(self, row, tx_id, created, gross, fee, converted_refunded,
+                                    refund_date, company_code, created_date=None, transfer_date=None,
+                                    refund_day=None, refund_transfer_date=None):
+        """
+        Build gross/fee/refund entries for one Paid/Refunded unified payment (amounts as floats)
+
+        The chunk parser passes the calendar/payout dates it already computed
+        column-wise; otherwise they are derived from created and refund_date.
+        """
+        net = round(gross - fee, 2)
+
+        # Determine party (customer email)
+        party = row.get('Customer Email', '').strip()
+        if not party or party == '':
+            party = self._extract_party_from_metadata(row) or 'N/A'
+
+        # Get description from metadata
+        description = self._build_description_from_metadata(row)
+
+        # Determine transaction type from ID prefix
+        if tx_id.startswith('ch_'):
+            tx_type = 'charge'
+        elif tx_id.startswith('py_'):
+            tx_type = 'payment'
+        elif tx_id.startswith('re_'):
+            tx_type = 'refund'
         else:
-            return row.get('Description', '').strip() or 'Payment'
+            tx_type = 'payment'
+
+        transactions = []
+
+        account_name = self.company_names.get(company_code, 'Unknown Company')
+
+        # Create the main charge/payment transaction
+        if gross > 0:
+            if created_date is None:
+                created_date = created.date()
+                transfer_date = (created + timedelta(days=6)).date()  # Stripe ~6 days to payout
+
+            # Gross entry (debit - increases balance)
+            gross_tx = _UNIFIED_GROSS_TEMPLATE.copy()
+            gross_tx['id'] = tx_id + '_gross'
+            gross_tx['stripe_id'] = tx_id
+            gross_tx['date'] = created_date
+            gross_tx['nature'] = 'Charge' if tx_type == 'charge' else 'Payment'
+            gross_tx['party'] = party
+            gross_tx['debit'] = float(gross)
+            gross_tx['description'] = description
+            gross_tx['gross'] = float(gross)
+            gross_tx['amount'] = float(gross)
+            gross_tx['fee'] = float(fee)
+            gross_tx['net_amount'] = float(net)
+            gross_tx['type'] = tx_type
+            gross_tx['created'] = created
+            gross_tx['available_on'] = created_date
+            gross_tx['transfer_date'] = transfer_date
+            gross_tx['account_name'] = account_name
+            gross_tx['company_code'] = company_code
+            transactions.append(gross_tx)
+
+            # Fee entry (credit - decreases balance)
+            if fee > 0:
+                fee_tx = _UNIFIED_FEE_TEMPLATE.copy()
+                fee_tx['id'] = tx_id + '_fee'
+                fee_tx['stripe_id'] = tx_id
+                fee_tx['date'] = created_date
+                fee_tx['credit'] = float(fee)
+                fee_tx['description'] = f"Fee for {description}"
+                fee_tx['amount'] = float(-fee)
+                fee_tx['fee'] = float(fee)
+                fee_tx['net_amount'] = float(-fee)
+                fee_tx['created'] = created
+                fee_tx['available_on'] = created_date
+                fee_tx['transfer_date'] = transfer_date
+                fee_tx['account_name'] = account_name
+                fee_tx['company_code'] = company_code
+                transactions.append(fee_tx)
+
+        # Handle refund if this payment was refunded
+        if converted_refunded > 0 and refund_date:
+            if refund_day is None:
+                refund_day = refund_date.date()
+                refund_transfer_date = (refund_date + timedelta(days=2)).date()
+
+            # Refund gross entry (credit - decreases balance)
+            refund_tx = _UNIFIED_REFUND_TEMPLATE.copy()
+            refund_tx['id'] = tx_id + '_refund'
+            refund_tx['stripe_id'] = tx_id
+            refund_tx['date'] = refund_day
+            refund_tx['party'] = party
+            refund_tx['credit'] = float(converted_refunded)
+            refund_tx['description'] = f"Refund for {description}"
+            refund_tx['gross'] = float(-converted_refunded)
+            refund_tx['amount'] = float(-converted_refunded)
+            refund_tx['net_amount'] = float(-converted_refunded)
+            refund_tx['created'] = refund_date
+            refund_tx['available_on'] = refund_day
+            refund_tx['transfer_date'] = refund_transfer_date
+            refund_tx['account_name'] = account_name
+            refund_tx['company_code'] = company_code
+            transactions.append(refund_tx)
+
+        return transactions if transactions else None
+
+    def _build_description_from_metadata(self, row):
+        """Build description from metadata fields"""
+        parts = []
+
+        # Product name, site, then type (subscription, donation, etc.);
+        # the first non-empty key of each group is used
+        for keys in self._DESC_KEYS:
+            for key in keys:
+                value = row.get(key, '').strip()
+                if value:
+                    if value not in parts:
+                        parts.append(value)
+                    break
+
+        return ' - '.join(parts) or row.get('Description', '').strip() or 'Payment'
     
     def _read_csv_file(self, csv_file, company_code):
         """Read and parse a single CSV file"""
         transactions = []
         
+        # Resolved once per file rather than per row
+        account_name = self.company_names.get(company_code, 'Unknown Company')
+        
         try:
-            with open(csv_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+            # Rows without an id are dropped in bulk when pandas is installed
+            for row in self._iter_csv_rows(csv_file, required='id'):
+                if not row.get('id', '').strip():
+                    continue
                 
-                for row in reader:
-                    if not row.get('id', '').strip():
-                        continue
-                    
-                    try:
-                        parsed_transactions = self._parse_csv_row(row, company_code)
-                        if parsed_transactions:
-                            if isinstance(parsed_transactions, list):
-                                transactions.extend(parsed_transactions)
-                            else:
-                                transactions.append(parsed_transactions)
-                    except Exception as e:
-                        self.logger.warning(f"Error parsing row in {csv_file}: {e}")
-                        continue
+                try:
+                    parsed_transactions = self._parse_csv_row(row, company_code, account_name)
+                    if parsed_transactions:
+                        if isinstance(parsed_transactions, list):
+                            transactions.extend(parsed_transactions)
+                        else:
+                            transactions.append(parsed_transactions)
+                except Exception as e:
+                    self.logger.warning(f"Error parsing row in {csv_file}: {e}")
+                    continue
                         
         except Exception as e:
             self.logger.error(f"Error reading CSV file {csv_file}: {e}")
             
         return transactions
     
-    def _parse_csv_row(self, row, company_code):
+    def _parse_csv_row(self, row, company_code, account_name=None):
         """Parse a CSV row into standardized transaction format"""
+        if account_name is None:
+            account_name = self.company_names.get(company_code, 'Unknown Company')
+        stripe_id = row.get('id', '')
         try:
             # Parse created date - handle both column name variations
             created_str = row.get('Created date (UTC)', '') or row.get('Created (UTC)', '')
-            created_str = created_str.strip()
-            created = None
-            if created_str:
-                try:
-                    created = datetime.strptime(created_str, '%Y-%m-%d %H:%M')
-                except ValueError:
-                    try:
-                        created = datetime.strptime(created_str, '%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        pass
+            created = _fast_parse_dt(created_str.strip())
             
             # Parse available date
-            available_str = row.get('Available On (UTC)', '').strip()
-            available_on = None
-            if available_str:
-                try:
-                    available_on = datetime.strptime(available_str, '%Y-%m-%d %H:%M').date()
-                except ValueError:
-                    try:
-                        available_on = datetime.strptime(available_str, '%Y-%m-%d').date()
-                    except ValueError:
-                        pass
+            available_on = _fast_parse_dt(row.get('Available On (UTC)', '').strip(), _DATE_OR_DATETIME_LENGTHS)
+            if available_on:
+                available_on = available_on.date()
             
             # Parse transfer date (for payout reconciliation)
             # First try explicit Transfer Date column
-            transfer_str = row.get('Transfer Date (UTC)', '').strip()
-            transfer_date = None
-            if transfer_str:
-                try:
-                    transfer_date = datetime.strptime(transfer_str, '%Y-%m-%d %H:%M').date()
-                except ValueError:
-                    try:
-                        transfer_date = datetime.strptime(transfer_str, '%Y-%m-%d').date()
-                    except ValueError:
-                        pass
+            transfer_date = _fast_parse_dt(row.get('Transfer Date (UTC)', '').strip(), _DATE_OR_DATETIME_LENGTHS)
+            if transfer_date:
+                transfer_date = transfer_date.date()
             
             # If no transfer date but we have a created date, use created + 2 days as estimated transfer
             # (Stripe typically transfers funds 2 days after transaction)
             if not transfer_date and created:
                 transfer_date = (created + timedelta(days=2)).date()
             
+            tx_date = created.date() if created else (available_on if available_on else None)
+            # Upper/lower-casing makes a new string per row; intern so entries share one object per code
+            currency = sys.intern(row.get('Currency', 'hkd').upper())
+            
             # Determine transaction type from ID or Type column
-            transaction_type = row.get('Type', '').lower()
+            transaction_type = sys.intern(row.get('Type', '').lower())
             
             # If no Type column, infer from ID prefix
             if not transaction_type:
-                tx_id = row.get('id', '').strip()
+                tx_id = stripe_id.strip()
                 if tx_id.startswith('py_') or tx_id.startswith('pi_'):
                     transaction_type = 'payment'
                 elif tx_id.startswith('ch_'):
@@ -640,93 +1452,56 @@ class CompleteCsvService:
             # Determine party (customer reference)
             party = self._extract_party_from_metadata(row) or self._extract_party_from_description(description)
             
-            # For charges, we'll create multiple entries: gross, fee, net
-            transactions = []
+            # Fields shared by every entry built from this row
+            entry = _COMPLETE_ENTRY_TEMPLATE.copy()
+            entry['id'] = stripe_id
+            entry['stripe_id'] = stripe_id
+            entry['date'] = tx_date
+            entry['party'] = party
+            entry['currency'] = currency
+            entry['status'] = status
+            entry['type'] = transaction_type
+            entry['created'] = created
+            entry['available_on'] = available_on
+            entry['transfer_date'] = transfer_date
+            entry['account_name'] = account_name
+            entry['company_code'] = company_code
+            if self.keep_raw_row:
+                # Only the source fields that callers read back, so the full CSV row can be freed
+                entry['raw_row'] = {key: row[key] for key in RAW_ROW_KEYS if key in row}
             
-            if transaction_type in ['charge', 'payment'] and fee > 0:
+            # For charges, we'll create multiple entries: gross, fee, net
+            if transaction_type in _CHARGE_TYPES and fee > 0:
                 # Create gross amount entry (debit)
-                gross_tx = {
-                    'id': row.get('id', '') + '_gross',
-                    'stripe_id': row.get('id', ''),
-                    'date': created.date() if created else (available_on if available_on else None),
-                    'nature': 'Gross ' + self._map_nature(transaction_type, description),
-                    'party': party,
-                    'debit': abs(amount),
-                    'credit': 0,
-                    'balance': 0,
-                    'acknowledged': False,
-                    'description': f"Gross {description}",
-                    'amount': amount,
-                    'fee': 0,
-                    'net_amount': amount,
-                    'currency': row.get('Currency', 'hkd').upper(),
-                    'status': status,
-                    'type': transaction_type,
-                    'created': created,
-                    'available_on': available_on,
-                    'transfer_date': transfer_date,
-                    'account_name': self.company_names.get(company_code, 'Unknown Company'),
-                    'company_code': company_code,
-                    'raw_row': row
-                }
+                gross_tx = entry.copy()
+                gross_tx['id'] = stripe_id + '_gross'
+                gross_tx['nature'] = sys.intern('Gross ' + self._map_nature(transaction_type, description))
+                gross_tx['debit'] = abs(amount)
+                gross_tx['credit'] = 0
+                gross_tx['description'] = f"Gross {description}"
+                gross_tx['amount'] = amount
+                gross_tx['fee'] = 0
+                gross_tx['net_amount'] = amount
                 
                 # Create fee entry (credit - reduces balance)
-                fee_tx = {
-                    'id': row.get('id', '') + '_fee',
-                    'stripe_id': row.get('id', ''),
-                    'date': created.date() if created else (available_on if available_on else None),
-                    'nature': 'Processing Fee',
-                    'party': 'Stripe',
-                    'debit': 0,
-                    'credit': abs(fee),
-                    'balance': 0,
-                    'acknowledged': False,
-                    'description': f"Processing fee for {description}",
-                    'amount': -fee,
-                    'fee': fee,
-                    'net_amount': -fee,
-                    'currency': row.get('Currency', 'hkd').upper(),
-                    'status': status,
-                    'type': 'fee',
-                    'created': created,
-                    'available_on': available_on,
-                    'transfer_date': transfer_date,
-                    'account_name': self.company_names.get(company_code, 'Unknown Company'),
-                    'company_code': company_code,
-                    'raw_row': row,
-                    'is_fee': True
-                }
+                fee_tx = entry
+                fee_tx['id'] = stripe_id + '_fee'
+                fee_tx['nature'] = 'Processing Fee'
+                fee_tx['party'] = 'Stripe'
+                fee_tx['debit'] = 0
+                fee_tx['credit'] = abs(fee)
+                fee_tx['description'] = f"Processing fee for {description}"
+                fee_tx['amount'] = -fee
+                fee_tx['fee'] = fee
+                fee_tx['net_amount'] = -fee
+                fee_tx['type'] = 'fee'
+                fee_tx['is_fee'] = True
                 
                 return [gross_tx, fee_tx]
-            elif transaction_type in ['charge', 'payment']:
+            elif transaction_type in _CHARGE_TYPES:
                 # For charges without fees, use net amount
-                net_debit = abs(net) if net > 0 else 0
-                net_credit = abs(net) if net < 0 else 0
-                
-                return [{
-                    'id': row.get('id', ''),
-                    'stripe_id': row.get('id', ''),
-                    'date': created.date() if created else (available_on if available_on else None),
-                    'nature': self._map_nature(transaction_type, description),
-                    'party': party,
-                    'debit': net_debit,
-                    'credit': net_credit,
-                    'balance': 0,
-                    'acknowledged': False,
-                    'description': description,
-                    'amount': amount,
-                    'fee': fee,
-                    'net_amount': net,
-                    'currency': row.get('Currency', 'hkd').upper(),
-                    'status': status,
-                    'type': transaction_type,
-                    'created': created,
-                    'available_on': available_on,
-                    'transfer_date': transfer_date,
-                    'account_name': self.company_names.get(company_code, 'Unknown Company'),
-                    'company_code': company_code,
-                    'raw_row': row
-                }]
+                entry['debit'] = net if net > 0 else 0
+                entry['credit'] = -net if net < 0 else 0
             else:
                 # Simple transaction for payouts, refunds, etc.
                 if transaction_type == 'payout':
@@ -743,34 +1518,18 @@ class CompleteCsvService:
                     debit_amount = 0
                     credit_amount = abs(amount)
                 else:
-                    # Default handling for other transaction types
-                    debit_amount = abs(amount) if amount > 0 else 0
-                    credit_amount = abs(amount) if amount < 0 else 0
-                
-                return [{
-                    'id': row.get('id', ''),
-                    'stripe_id': row.get('id', ''),
-                    'date': created.date() if created else (available_on if available_on else None),
-                    'nature': self._map_nature(transaction_type, description),
-                    'party': party,
-                    'debit': debit_amount,
-                    'credit': credit_amount,
-                    'balance': 0,
-                    'acknowledged': False,
-                    'description': description,
-                    'amount': amount,
-                    'fee': fee,
-                    'net_amount': net,
-                    'currency': row.get('Currency', 'hkd').upper(),
-                    'status': status,
-                    'type': transaction_type,
-                    'created': created,
-                    'available_on': available_on,
-                    'transfer_date': transfer_date,
-                    'account_name': self.company_names.get(company_code, 'Unknown Company'),
-                    'company_code': company_code,
-                    'raw_row': row  # Keep original row for reference
-                }]
+                    # Default handling for other transaction types (the sign picks the side)
+                    debit_amount = amount if amount > 0 else 0
+                    credit_amount = -amount if amount < 0 else 0
+                entry['debit'] = debit_amount
+                entry['credit'] = credit_amount
+            
+            entry['nature'] = self._map_nature(transaction_type, description)
+            entry['description'] = description
+            entry['amount'] = amount
+            entry['fee'] = fee
+            entry['net_amount'] = net
+            return [entry]
             
         except Exception as e:
             self.logger.error(f"Error parsing transaction: {e}")
@@ -784,38 +1543,31 @@ class CompleteCsvService:
             if not clean_value or clean_value == '':
                 return Decimal('0')
             # Enhanced precision with better rounding
-            decimal_val = Decimal(clean_value)
-            return decimal_val.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+            return _quantize_money(clean_value)
         except (InvalidOperation, ValueError) as e:
             self.logger.warning(f"Failed to parse decimal value '{value_str}': {e}")
             return Decimal('0')
     
+    def _parse_money(self, value_str):
+        """Parse a money value straight to float (for fields that are stored as floats)"""
+        try:
+            return float(value_str.replace(',', ''))
+        except (ValueError, TypeError, AttributeError):
+            return 0.0
+    
     def _determine_status(self, transaction_type, amount):
         """Determine transaction status based on type"""
-        if transaction_type in ['payment', 'charge']:
-            return 'succeeded'
-        elif transaction_type == 'refund':
-            return 'refunded'
-        elif transaction_type == 'payout':
-            return 'succeeded'
-        elif transaction_type == 'payout_failure':
-            return 'failed'
-        else:
-            return 'succeeded'  # Default for real money movement
+        return self._STATUS_BY_TYPE.get(transaction_type, 'succeeded')  # Default for real money movement
     
     def _map_nature(self, transaction_type, description):
         """Map transaction type to nature field (Stripe reference)"""
-        if transaction_type == 'payment':
-            return 'Payment'
-        elif transaction_type == 'charge':
-            return 'Charge'
-        elif transaction_type == 'refund':
-            return 'Refund'
-        elif transaction_type == 'payout':
-            return 'Payout'
+        nature = self._NATURE_BY_TYPE.get(transaction_type)
+        if nature:
+            return nature
         elif transaction_type == 'payout_failure':
-            # Check if it's a payout reversal/refund
-            if 'REFUND FOR PAYOUT' in description.upper():
+            # Check if it's a payout reversal/refund (Stripe writes this in upper case,
+            # so only upper-case a copy when the direct check misses)
+            if 'REFUND FOR PAYOUT' in description or 'REFUND FOR PAYOUT' in description.upper():
                 return 'Payout Reversal'
             else:
                 return 'Payout Failure'
@@ -869,16 +1621,14 @@ class CompleteCsvService:
             return "N/A"
         
         # Look for email pattern (prioritized)
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, description)
-        if emails:
-            return emails[0]
+        email = _EMAIL_RE.search(description)
+        if email:
+            return email.group(0)
         
         # Look for order references
-        order_pattern = r'Order #[A-Z0-9]+'
-        orders = re.findall(order_pattern, description)
-        if orders:
-            return orders[0]
+        order = _ORDER_RE.search(description)
+        if order:
+            return order.group(0)
         
         # Default to shortened description
         return description[:50] + "..." if len(description) > 50 else description
@@ -918,44 +1668,54 @@ class CompleteCsvService:
         else:
             end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
         
-        all_transactions = self.import_transactions_from_csv()
+        all_transactions = self._load_transactions()
         
-        # Filter transactions for the month by TRANSACTION DATE (for proper monthly balance tracking)
-        monthly_transactions = []
-        for tx in all_transactions:
-            tx_date = tx.get('date')
-            if tx_date and start_date <= tx_date <= end_date:
-                if company_filter and tx['company_code'] != company_filter:
-                    continue
-                monthly_transactions.append(tx)
+        if np is not None:
+            monthly_transactions, closing_balance, total_debit, total_credit = self._monthly_running_balance(
+                all_transactions, start_date, end_date, company_filter, previous_balance)
+        else:
+            # Filter transactions for the month by TRANSACTION DATE (for proper monthly balance tracking)
+            monthly_transactions = []
+            for tx in all_transactions:
+                tx_date = tx.get('date')
+                if tx_date and start_date <= tx_date <= end_date:
+                    if company_filter and tx['company_code'] != company_filter:
+                        continue
+                    monthly_transactions.append(tx.copy())
         
-        # Sort by transaction date for proper chronological order
-        monthly_transactions.sort(key=lambda x: x.get('date') or datetime.min.date())
+            # Sort by transaction date for proper chronological order
+            monthly_transactions.sort(key=lambda x: x.get('date') or datetime.min.date())
         
-        # Calculate running balance, but exclude transactions that occur in current month 
-        # but have transfer dates in the next month (for proper month-end balance)
-        running_balance = Decimal(str(previous_balance))
-        actual_closing_balance = running_balance
+            # Calculate running balance, but exclude transactions that occur in current month 
+            # but have transfer dates in the next month (for proper month-end balance)
+            # (accumulated in integer cents)
+            running_balance = _to_cents(previous_balance)
+            actual_closing_balance = running_balance
+            # Statement totals keep the amounts' own type (Decimal or float)
+            total_debit = 0
+            total_credit = 0
+            # Transfers after month end but within the immediate next month
+            exclude_until = end_date.replace(day=28) + timedelta(days=4)
         
-        for tx in monthly_transactions:
-            debit = Decimal(str(tx['debit']))
-            credit = Decimal(str(tx['credit']))
-            transfer_date = tx.get('transfer_date')
+            for tx in monthly_transactions:
+                transfer_date = tx.get('transfer_date')
+                debit = tx['debit']
+                credit = tx['credit']
+                total_debit += debit
+                total_credit += credit
             
-            # Standard debit/credit logic: debits increase balance, credits decrease balance
-            running_balance += debit - credit
+                # Standard debit/credit logic: debits increase balance, credits decrease balance
+                running_balance += _to_cents(debit) - _to_cents(credit)
             
-            tx['balance'] = float(running_balance)
+                tx['balance'] = running_balance / 100
             
-            # For month-end closing balance, exclude transactions that transfer in the immediate next month only
-            # (not transactions with transfer dates years in the future)
-            exclude_from_closing = (transfer_date and 
-                                  transfer_date > end_date and 
-                                  transfer_date <= end_date.replace(day=28) + timedelta(days=4))
-            if not exclude_from_closing:
-                actual_closing_balance = running_balance
+                # For month-end closing balance, exclude transactions that transfer in the immediate next month only
+                # (not transactions with transfer dates years in the future)
+                exclude_from_closing = transfer_date and end_date < transfer_date <= exclude_until
+                if not exclude_from_closing:
+                    actual_closing_balance = running_balance
         
-        closing_balance = float(actual_closing_balance)
+            closing_balance = actual_closing_balance / 100
         
         return {
             'transactions': monthly_transactions,
@@ -964,10 +1724,126 @@ class CompleteCsvService:
             'month': month,
             'year': year,
             'company_filter': company_filter,
-            'total_debit': sum(tx['debit'] for tx in monthly_transactions),
-            'total_credit': sum(tx['credit'] for tx in monthly_transactions)
+            'total_debit': total_debit,
+            'total_credit': total_credit
         }
 
+    def generate_monthly_statements_bulk(self, year, month, company_filters, use_parallel=False):
+        """
+        Generate monthly statements for several companies.
+
+        The transaction import is warmed once up front, so every statement
+        reuses the cached parse. With use_parallel=True each company runs in
+        its own worker process (forked workers inherit the warm cache); like
+        import_transactions_from_csv this only pays off for large exports.
+
+        Returns a dict mapping company code -> statement. A company whose
+        statement fails is logged and left out.
+        """
+        self._load_transactions()
+
+        statements = {}
+        executor = None
+        if use_parallel and len(company_filters) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(len(company_filters), os.cpu_count() or 1))
+            results = [executor.submit(self.generate_monthly_statement, year, month, company_filter)
+                       for company_filter in company_filters]
+
+        try:
+            for index, company_filter in enumerate(company_filters):
+                try:
+                    statements[company_filter] = (results[index].result() if executor
+                                                  else self.generate_monthly_statement(year, month, company_filter))
+                except Exception as e:
+                    self.logger.error(f"Error generating statement for {company_filter}: {e}")
+                    continue
+        finally:
+            if executor:
+                executor.shutdown()
+
+        return statements
+
+    def generate_stripe_report_statements_bulk(self, jobs, use_parallel=False):
+        """
+        Generate statements from Stripe reports for several (year, month,
+        company_filter) jobs, e.g. every company over a year.
+
+        Jobs are independent; with use_parallel=True each runs in its own
+        worker process, otherwise they run in turn and share the parsed
+        report cache. Returns a dict mapping (company_filter, year, month)
+        -> statement. A job that raises is logged and left out.
+        """
+        statements = {}
+        executor = None
+        if use_parallel and len(jobs) > 1:
+            executor = ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1))
+            results = [executor.submit(self.generate_monthly_statement_from_stripe_reports, year, month, company_filter)
+                       for year, month, company_filter in jobs]
+
+        try:
+            for index, (year, month, company_filter) in enumerate(jobs):
+                try:
+                    statements[(company_filter, year, month)] = (
+                        results[index].result() if executor
+                        else self.generate_monthly_statement_from_stripe_reports(year, month, company_filter))
+                except Exception as e:
+                    self.logger.error(f"Error generating Stripe report statement for {company_filter} {year}-{month:02d}: {e}")
+                    continue
+        finally:
+            if executor:
+                executor.shutdown()
+
+        return statements
+
+    def _monthly_running_balance(self, all_transactions, start_date, end_date, company_filter, previous_balance):
+        """
+        NumPy version of the monthly filter / sort / running balance.
+
+        Filters by transaction date and company with boolean masks, orders
+        with a stable argsort and builds the running balance with a cumsum
+        over integer cents (exact, like the Decimal loop). Sets each
+        transaction's 'balance' and returns (monthly_transactions,
+        closing_balance, total_debit, total_credit).
+        """
+        dates = np.array([tx.get('date') for tx in all_transactions], dtype='datetime64[D]')
+        mask = (dates >= np.datetime64(start_date)) & (dates <= np.datetime64(end_date))
+        if company_filter:
+            codes = np.array([tx['company_code'] for tx in all_transactions], dtype=object)
+            mask &= codes == company_filter
+
+        selected = np.flatnonzero(mask)
+        selected = selected[np.argsort(dates[selected], kind='stable')]
+        # Copies, since 'balance' is set on them and all_transactions is the shared import cache
+        monthly_transactions = [all_transactions[i].copy() for i in selected]
+
+        # Totals are summed in the same pass that collects the balance deltas
+        total_debit = 0
+        total_credit = 0
+        deltas = []
+        for tx in monthly_transactions:
+            debit = tx['debit']
+            credit = tx['credit']
+            total_debit += debit
+            total_credit += credit
+            deltas.append(_to_cents(debit) - _to_cents(credit))
+        delta_cents = np.array(deltas, dtype=np.int64)
+        # Dates as ordinals (0 when missing, which is never excluded)
+        transfer_ords = np.array(
+            [tx['transfer_date'].toordinal() if tx.get('transfer_date') else 0 for tx in monthly_transactions],
+            dtype=np.int64)
+
+        # For month-end closing balance, exclude transactions that transfer in the immediate next month only
+        # (not transactions with transfer dates years in the future)
+        balances, closing_cents = _running_balance_scan(
+            delta_cents, transfer_ords, end_date.toordinal(),
+            (end_date.replace(day=28) + timedelta(days=4)).toordinal(), _to_cents(previous_balance))
+
+        for tx, balance in zip(monthly_transactions, (balances / 100).tolist()):
+            tx['balance'] = balance
+        closing_balance = int(closing_cents) / 100
+
+        return monthly_transactions, closing_balance, total_debit, total_credit
+
     def generate_balance_summary(self, year, month, company_filter=None, start_day=1, end_day=None, starting_balance=None):
         """
         Generate Balance Summary matching Stripe's Balance Summary report format.
@@ -994,8 +1870,9 @@ class CompleteCsvService:
             end_date = datetime(year, month, end_day).date()
 
         # Get starting balance
+        # Balances and totals below are in integer cents
         if starting_balance is not None:
-            starting_balance = Decimal(str(starting_balance))
+            starting_balance = _to_cents(starting_balance)
         else:
             # Try to get from previous month's Balance Summary file
             prev_month = month - 1
@@ -1005,43 +1882,44 @@ class CompleteCsvService:
                 prev_year = year - 1
             prev_summary = self._read_stripe_balance_summary(prev_year, prev_month, company_filter)
             if prev_summary and 'ending_balance' in prev_summary:
-                starting_balance = Decimal(str(prev_summary['ending_balance']))
+                starting_balance = _to_cents(prev_summary['ending_balance'])
             else:
                 # Fall back to calculating from transactions
-                starting_balance = Decimal(str(self._get_previous_month_closing_balance(year, month, company_filter)))
+                starting_balance = _to_cents(self._get_previous_month_closing_balance(year, month, company_filter))
 
         # Get all transactions
-        all_transactions = self.import_transactions_from_csv()
+        all_transactions = self._load_transactions()
 
         # Filter transactions for the period
-        activity_gross = Decimal('0')
-        activity_fee = Decimal('0')
-        refund_gross = Decimal('0')
-        refund_fee = Decimal('0')
+        activity_gross = 0
+        activity_fee = 0
+        refund_gross = 0
+        refund_fee = 0
         charge_count = 0
         refund_count = 0
 
+        # Company first: it is the cheaper check and rejects most rows when set
         for tx in all_transactions:
-            if company_filter and tx.get('company_code') != company_filter:
+            if company_filter and tx['company_code'] != company_filter:
                 continue
 
-            tx_date = tx.get('date')
-            if not tx_date or tx_date < start_date or tx_date > end_date:
+            tx_date = tx['date']
+            if tx_date is None or not start_date <= tx_date <= end_date:
                 continue
 
             tx_type = tx.get('type', '')
             reporting_cat = tx.get('reporting_category', '')
 
             # Charges/Payments contribute to activity_gross
-            if tx_type in ['charge', 'payment'] and not tx.get('is_fee'):
-                activity_gross += Decimal(str(tx.get('debit', 0)))
+            if tx_type in _CHARGE_TYPES and not tx.get('is_fee'):
+                activity_gross += _to_cents(tx.get('debit', 0))
                 charge_count += 1
             # Fees reduce the activity
             elif tx_type == 'fee' or tx.get('is_fee'):
-                activity_fee += Decimal(str(tx.get('credit', 0)))
+                activity_fee += _to_cents(tx.get('credit', 0))
             # Refunds are negative activity
             elif tx_type == 'refund':
-                refund_gross += Decimal(str(tx.get('credit', 0)))
+                refund_gross += _to_cents(tx.get('credit', 0))
                 refund_count += 1
 
         # Calculate activity net (gross - fees - refunds)
@@ -1054,12 +1932,12 @@ class CompleteCsvService:
 
         # Try to read payouts from Stripe's Itemised Payouts file
         payouts_data = self._read_stripe_itemised_payouts(year, month, company_filter, start_date, end_date)
-        payouts_gross = Decimal(str(payouts_data.get('gross', 0)))
-        payouts_fee = Decimal(str(payouts_data.get('fee', 0)))
+        payouts_gross = _to_cents(payouts_data.get('gross', 0))
+        payouts_fee = _to_cents(payouts_data.get('fee', 0))
         payouts_net = payouts_gross - payouts_fee
 
         # Calculate ending balance: starting + activity - payouts
-        ending_balance = Decimal(str(starting_balance)) + activity_net - payouts_net
+        ending_balance = starting_balance + activity_net - payouts_net
 
         # For accurate results, read from the Stripe Balance Summary if available
         stripe_balance_summary = self._read_stripe_balance_summary(year, month, company_filter)
@@ -1077,26 +1955,26 @@ class CompleteCsvService:
             },
             'company': company_filter,
             'currency': 'hkd',
-            'starting_balance': float(starting_balance),
+            'starting_balance': starting_balance / 100,
             'activity': {
-                'gross': float(total_gross),  # Stripe format: charges - refunds
-                'fee': float(-activity_fee),
-                'net': float(activity_net),
+                'gross': total_gross / 100,  # Stripe format: charges - refunds
+                'fee': -activity_fee / 100,
+                'net': activity_net / 100,
                 'charge_count': charge_count,
                 'refund_count': refund_count,
                 'detail': {
-                    'charges_gross': float(activity_gross),
-                    'refunds_gross': float(-refund_gross)
+                    'charges_gross': activity_gross / 100,
+                    'refunds_gross': -refund_gross / 100
                 }
             },
             'payouts': {
-                'gross': float(-payouts_gross),  # Negative because money leaves balance
-                'fee': float(payouts_fee),
-                'net': float(-payouts_net)  # Negative because money leaves balance
+                'gross': -payouts_gross / 100,  # Negative because money leaves balance
+                'fee': payouts_fee / 100,
+                'net': -payouts_net / 100  # Negative because money leaves balance
             },
-            'ending_balance': float(ending_balance),
+            'ending_balance': ending_balance / 100,
             'reconciliation': {
-                'calculated_ending': float(Decimal(str(starting_balance)) + activity_net - (payouts_gross - payouts_fee)),
+                'calculated_ending': (starting_balance + activity_net - (payouts_gross - payouts_fee)) / 100,
                 'formula': 'starting_balance + activity_net - payouts_net'
             },
             'source': 'calculated'
@@ -1105,137 +1983,208 @@ class CompleteCsvService:
     def _build_party_lookup_from_unified(self, company_filter, year, month):
         """
         Build a lookup table from unified payments CSV to get party names.
-        Returns a dict mapping (date, amount) -> party_info
+        Returns a _PartyLookup mapping (date, amount) -> party_info
         """
-        lookup = {}
-
         # Find the unified file for this company
         pattern = f"{company_filter}_unified_*.csv"
-        search_path = os.path.join(self.root_directory, pattern)
-        files = glob.glob(search_path)
+        files = self._find_root_files(pattern)
 
         if not files:
             self.logger.info(f"No unified file found for {company_filter}")
-            return lookup
+            return _PartyLookup()
 
         # Use the most recent unified file
         unified_file = sorted(files)[-1]
+        return self._cached_report(self._parse_party_lookup, unified_file, year, month)
+
+    def _parse_party_lookup(self, unified_file, year, month):
+        """Party lookup for one month of a unified payments file"""
+        lookup = {}
         self.logger.info(f"Building party lookup from {unified_file}")
 
-        try:
-            with open(unified_file, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+        (i_created, i_converted, i_amount, i_status, i_user_name, i_email, i_description,
+         i_product, i_site, i_site_alt, i_subs_type, i_plan_days, i_active, i_active_alt,
+         i_expiry, i_expiry_alt, i_currency, i_fee, i_id, i_customer_id) = range(len(PARTY_COLUMNS))
 
-                for row in reader:
-                    # Parse date
-                    created_str = row.get('Created date (UTC)', '').strip()
-                    if not created_str:
-                        continue
+        try:
+            for row in self._iter_party_rows(unified_file, year, month):
+                # Parse date
+                created_str = row[i_created].strip()
+                if not created_str:
+                    continue
 
-                    try:
-                        created = datetime.strptime(created_str, '%Y-%m-%d %H:%M:%S')
-                    except ValueError:
-                        try:
-                            created = datetime.strptime(created_str, '%Y-%m-%d %H:%M')
-                        except ValueError:
-                            continue
+                created = _fast_parse_dt(created_str)
+                if created is None:
+                    continue
 
-                    # Only include transactions from the target month
-                    if created.year != year or created.month != month:
-                        continue
+                # Only include transactions from the target month
+                if created.year != year or created.month != month:
+                    continue
 
-                    # Get amount - use Converted Amount (HKD) for matching with Stripe reports
-                    amount_str = row.get('Converted Amount', '').strip()
-                    if not amount_str:
-                        amount_str = row.get('Amount', '0').strip()
-                    try:
-                        amount = float(amount_str) if amount_str else 0
-                    except ValueError:
-                        amount = 0
-
-                    # Skip non-successful payments
-                    status = row.get('Status', '').strip().lower()
-                    if status not in ['paid', 'succeeded', 'captured']:
-                        continue
+                # Get amount - use Converted Amount (HKD) for matching with Stripe reports
+                amount_str = row[i_converted].strip()
+                if not amount_str:
+                    amount_str = row[i_amount].strip()
+                try:
+                    amount = float(amount_str) if amount_str else 0
+                except ValueError:
+                    amount = 0
 
-                    # Get party info
-                    party_name = row.get('3. User name (metadata)', '').strip()
-                    if not party_name or party_name == 'Not provided':
-                        party_name = row.get('Customer Email', '').strip()
-                    if not party_name:
-                        party_name = row.get('Customer Description', '').strip()
-
-                    product_name = row.get('4. Product name (metadata)', '').strip()
-                    customer_email = row.get('Customer Email', '').strip()
-
-                    # If no party name, use product as description
-                    if not party_name and product_name:
-                        party_name = product_name[:30]
-
-                    # Create lookup key based on date and amount
-                    date_key = created.date()
-
-                    # Get additional fields for Sales Transaction Details
-                    site_service = row.get('1. Site (metadata)', '').strip()
-                    if not site_service:
-                        site_service = row.get('site (metadata)', '').strip()
-
-                    # Get subscription plan info
-                    subs_type = row.get('subs_type (metadata)', '').strip()
-                    plan_days = row.get('plan_days (metadata)', '').strip()
-                    subscription_plan = subs_type
-                    if plan_days:
-                        subscription_plan = f"{subs_type} ({plan_days} days)" if subs_type else f"({plan_days} days)"
-
-                    # Get active and expiry dates
-                    active_date = row.get('4. Active date (metadata)', '').strip()
-                    if not active_date:
-                        active_date = row.get('3. Active date (metadata)', '').strip()
-                    expiry_date = row.get('5. Expiry date (metadata)', '').strip()
-                    if not expiry_date:
-                        expiry_date = row.get('4. Expiry date (metadata)', '').strip()
-
-                    # Get original amount and currency
-                    original_amount = row.get('Amount', '').strip()
-                    original_currency = row.get('Currency', '').strip().upper()
-
-                    # Get fee
-                    fee_str = row.get('Fee', '0').strip()
-                    try:
-                        fee = float(fee_str) if fee_str else 0
-                    except ValueError:
-                        fee = 0
-
-                    # Store in lookup with multiple possible keys
-                    lookup_key = (date_key, amount)
-                    lookup[lookup_key] = {
-                        'party_name': party_name if party_name else 'Customer',
-                        'product': product_name,
-                        'email': customer_email,
-                        'payment_id': row.get('id', ''),
-                        'customer_id': row.get('Customer ID', '').strip(),
-                        'user_name': row.get('3. User name (metadata)', '').strip(),
-                        'site_service': site_service,
-                        'subscription_plan': subscription_plan,
-                        'active_date': active_date,
-                        'expiry_date': expiry_date if expiry_date else 'N/A',
-                        'original_amount': original_amount,
-                        'original_currency': original_currency,
-                        'converted_amount': amount,
-                        'processing_fee': fee,
-                        'transaction_id': row.get('id', ''),
-                        'created_date': created_str
-                    }
+                # Skip non-successful payments
+                status = row[i_status].strip().lower()
+                if status not in PARTY_STATUSES:
+                    continue
 
-                    # Also store with rounded amounts for matching
-                    lookup[(date_key, round(amount, 2))] = lookup[lookup_key]
+                # Get party info
+                party_name = row[i_user_name].strip()
+                if not party_name or party_name == 'Not provided':
+                    party_name = row[i_email].strip()
+                if not party_name:
+                    party_name = row[i_description].strip()
+
+                product_name = row[i_product].strip()
+                customer_email = row[i_email].strip()
+
+                # If no party name, use product as description
+                if not party_name and product_name:
+                    party_name = product_name[:30]
+
+                # Create lookup key based on date and amount
+                date_key = created.date()
+
+                # Get additional fields for Sales Transaction Details
+                site_service = row[i_site].strip()
+                if not site_service:
+                    site_service = row[i_site_alt].strip()
+
+                # Get subscription plan info
+                subs_type = row[i_subs_type].strip()
+                plan_days = row[i_plan_days].strip()
+                subscription_plan = subs_type
+                if plan_days:
+                    subscription_plan = f"{subs_type} ({plan_days} days)" if subs_type else f"({plan_days} days)"
+
+                # Get active and expiry dates
+                active_date = row[i_active].strip()
+                if not active_date:
+                    active_date = row[i_active_alt].strip()
+                expiry_date = row[i_expiry].strip()
+                if not expiry_date:
+                    expiry_date = row[i_expiry_alt].strip()
+
+                # Get original amount and currency
+                original_amount = row[i_amount].strip()
+                original_currency = row[i_currency].strip().upper()
+
+                # Get fee
+                fee_str = row[i_fee].strip()
+                try:
+                    fee = float(fee_str) if fee_str else 0
+                except ValueError:
+                    fee = 0
+
+                # Later rows for the same date and amount replace earlier ones
+                lookup[_PartyLookup.key(date_key, amount)] = {
+                    'party_name': party_name if party_name else 'Customer',
+                    'product': product_name,
+                    'email': customer_email,
+                    'payment_id': row[i_id],
+                    'customer_id': row[i_customer_id].strip(),
+                    'user_name': row[i_user_name].strip(),
+                    'site_service': site_service,
+                    'subscription_plan': subscription_plan,
+                    'active_date': active_date,
+                    'expiry_date': expiry_date if expiry_date else 'N/A',
+                    'original_amount': original_amount,
+                    'original_currency': original_currency,
+                    'converted_amount': amount,
+                    'processing_fee': fee,
+                    'transaction_id': row[i_id],
+                    'created_date': created_str
+                }
 
         except Exception as e:
             self.logger.error(f"Error building party lookup: {e}")
 
+        lookup = _PartyLookup(lookup)
         self.logger.info(f"Built party lookup with {len(lookup)} entries")
         return lookup
 
+    def _iter_party_rows(self, unified_file, year, month):
+        """
+        Yield unified-file rows as sequences laid out like PARTY_COLUMNS.
+
+        Absent columns and missing cells come through as ''. With PyArrow the
+        rows are pre-filtered to the target month's successful payments in
+        native code; the caller still applies its own checks, so both paths
+        give the same lookup.
+        """
+        with _open_csv(unified_file) as file:
+            reader = csv.reader(file)
+            header = next(reader, [])
+            width = len(header)
+            present = [name for name in PARTY_COLUMNS if name in header]
+
+            if pa is not None and len(set(header)) == width:
+                try:
+                    rows = self._read_party_rows_arrow(unified_file, present, year, month)
+                except pa.ArrowInvalid as e:
+                    # Ragged rows and the like; the csv module pads those
+                    self.logger.warning(f"Arrow could not read {unified_file}, using csv: {e}")
+                else:
+                    yield from rows
+                    return
+
+            # Absent columns point at the empty cell appended to every row
+            index = {name: i for i, name in enumerate(header)}
+            positions = [index.get(name, width) for name in PARTY_COLUMNS]
+            for row in reader:
+                if len(row) == width:
+                    row.append('')
+                else:
+                    row = (row + [''] * width)[:width] + ['']
+                yield [row[i] for i in positions]
+
+    def _read_party_rows_arrow(self, unified_file, present, year, month):
+        """Read the party columns with PyArrow, keeping only rows that may be in the target month"""
+        if 'Created date (UTC)' not in present or 'Status' not in present:
+            # The caller skips every row in this case
+            return []
+
+        reader = pa_csv.open_csv(
+            unified_file,
+            read_options=pa_csv.ReadOptions(block_size=ARROW_BLOCK_SIZE, use_threads=True),
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                include_columns=present,
+                column_types={name: pa.string() for name in present},
+                strings_can_be_null=False,
+            ),
+        )
+        # Timestamps that start with another year-month can't be in the
+        # target month; anything not in that shape is left to the caller
+        in_month = rf"^\s*{year:04d}-{month:02d}"
+        dated = r"^\s*\d{4}-\d{2}"
+        statuses = pa.array(PARTY_STATUSES)
+
+        rows = []
+        for batch in reader:
+            created = batch.column('Created date (UTC)')
+            status = pc.utf8_lower(pc.utf8_trim_whitespace(batch.column('Status')))
+            mask = pc.and_(
+                pc.is_in(status, value_set=statuses),
+                pc.or_(pc.match_substring_regex(created, in_month),
+                       pc.invert(pc.match_substring_regex(created, dated))),
+            )
+            batch = batch.filter(mask)
+            if not batch.num_rows:
+                continue
+            blank = [''] * batch.num_rows
+            columns = [batch.column(name).to_pylist() if name in present else blank
+                       for name in PARTY_COLUMNS]
+            rows.extend(zip(*columns))
+        return rows
+
     def _generate_wechat_monthly_statement(self, year, month, start_day=1, end_day=None):
         """
         Generate monthly statement for CGGE (Shenzhen) WeChat data.
@@ -1256,7 +2205,7 @@ class CompleteCsvService:
             end_date = datetime(year, month, end_day).date()
 
         # Get WeChat transactions
-        all_transactions = self.import_transactions_from_csv()
+        all_transactions = self._load_transactions()
 
         # Filter for cgge_sz transactions in the specified month
         monthly_transactions = []
@@ -1270,12 +2219,12 @@ class CompleteCsvService:
         if not monthly_transactions:
             return {'error': f'No WeChat data found for cgge_sz {year}-{month:02d}. Upload a WeChat TRADE_DATA CSV file.'}
 
-        # Calculate totals
-        total_sales = Decimal('0')
+        # Calculate totals in integer cents; the per-row gross is reused below
+        gross_cents = [_to_cents(tx.get('gross', 0)) for tx in monthly_transactions]
+        total_sales = Decimal(sum(gross_cents)) / 100
         total_transactions = 0
 
         for tx in monthly_transactions:
-            total_sales += Decimal(str(tx.get('gross', 0)))
             total_transactions += tx.get('transaction_count', 1)
 
         # Get previous month's closing balance as opening balance
@@ -1307,9 +2256,10 @@ class CompleteCsvService:
         })
 
         # Add WeChat transaction entries
-        for tx in monthly_transactions:
-            gross = Decimal(str(tx.get('gross', 0)))
-            running_balance += gross
+        running_cents = _to_cents(opening_balance)
+        for tx, cents in zip(monthly_transactions, gross_cents):
+            gross = cents / 100
+            running_cents += cents
 
             all_statement_transactions.append({
                 'date': tx.get('created') or tx.get('date'),
@@ -1317,12 +2267,12 @@ class CompleteCsvService:
                 'nature': 'WeChat Sales',
                 'party': 'WeChat Customers',
                 'description': tx.get('description', 'WeChat Sales'),
-                'gross': float(gross),
+                'gross': gross,
                 'fee': 0,
-                'net': float(gross),
-                'debit': float(gross),
+                'net': gross,
+                'debit': gross,
                 'credit': 0,
-                'balance': float(running_balance),
+                'balance': running_cents / 100,
                 'acknowledged': 'No',
                 'category': 'activity',
                 'transaction_count': tx.get('transaction_count', 0),
@@ -1461,28 +2411,25 @@ class CompleteCsvService:
                 pass
 
         # If Stripe report ends before our requested end_date, supplement with unified file
+        # (supplement totals in integer cents)
         supplement_transactions = []
-        supplement_activity_gross = Decimal('0')
-        supplement_activity_fee = Decimal('0')
-        supplement_activity_net = Decimal('0')
+        supplement_activity_gross = 0
+        supplement_activity_fee = 0
+        supplement_activity_net = 0
 
         if stripe_end_date and stripe_end_date < end_date:
             self.logger.info(f"Stripe report ends on {stripe_end_date}, supplementing with unified file data until {end_date}")
-            # Get transactions from unified file for the gap period
-            all_transactions = self.import_transactions_from_csv()
-            for tx in all_transactions:
-                if company_filter and tx.get('company_code') != company_filter:
-                    continue
-                tx_date = tx.get('date')
-                if tx_date and stripe_end_date < tx_date <= end_date:
-                    supplement_transactions.append(tx)
-                    tx_type = tx.get('type', '')
-                    if tx_type in ['charge', 'payment'] and not tx.get('is_fee'):
-                        supplement_activity_gross += Decimal(str(tx.get('debit', 0)))
-                    elif tx_type == 'fee' or tx.get('is_fee'):
-                        supplement_activity_fee += Decimal(str(tx.get('credit', 0)))
-                    elif tx_type == 'refund':
-                        supplement_activity_gross -= Decimal(str(tx.get('credit', 0)))
+            # Get transactions from unified file for the gap period (copied, as they end up in the result)
+            supplement_transactions = [
+                tx.copy() for tx in self._transactions_in_date_range(company_filter, stripe_end_date, end_date)]
+            for tx in supplement_transactions:
+                tx_type = tx.get('type', '')
+                if tx_type in _CHARGE_TYPES and not tx.get('is_fee'):
+                    supplement_activity_gross += _to_cents(tx.get('debit', 0))
+                elif tx_type == 'fee' or tx.get('is_fee'):
+                    supplement_activity_fee += _to_cents(tx.get('credit', 0))
+                elif tx_type == 'refund':
+                    supplement_activity_gross -= _to_cents(tx.get('credit', 0))
 
             supplement_activity_net = supplement_activity_gross - supplement_activity_fee
 
@@ -1500,7 +2447,6 @@ class CompleteCsvService:
 
         # Create transaction list with running balance
         all_transactions = []
-        running_balance = opening_balance
 
         # Add opening balance entry (per sample: Nature="Opening Balance", Party="Brought Forward", Credit=amount)
         all_transactions.append({
@@ -1514,19 +2460,25 @@ class CompleteCsvService:
             'net': 0,
             'debit': 0,
             'credit': float(opening_balance) if opening_balance >= 0 else 0,
-            'balance': float(running_balance),
+            'balance': float(opening_balance),
             'acknowledged': 'Yes',
             'category': 'balance'
         })
 
         # Combine activity and payout transactions, sort by date
         combined = []
+        # Party info already looked up for each activity row (by id() of its first
+        # row) and each supplement Gross Charge row, so Sales Transaction Details
+        # below doesn't probe the lookup again
+        gross_row_party = {}
+        # Charge/refund statistics [count, gross, fees, net], accumulated in
+        # integer cents in the same pass
+        activity_totals = {'charge': [0, 0, 0, 0], 'refund': [0, 0, 0, 0]}
 
         for tx in activity_transactions:
             # Look up party info from unified file
             tx_date = tx['created'].date() if tx['created'] else None
-            gross = tx.get('gross', 0)
-            party_info = party_lookup.get((tx_date, gross)) or party_lookup.get((tx_date, round(gross, 2)))
+            party_info = party_lookup.get(tx_date, tx.get('gross', 0))
 
             party_name = 'Customer'
             if party_info:
@@ -1542,88 +2494,17 @@ class CompleteCsvService:
             if party_info and party_info.get('product'):
                 product_desc = party_info['product']
 
-            # Per sample format: Split each transaction into Gross row and Fee row
-            if category == 'charge':
-                # Row 1: Gross Charge (Debit = gross amount)
-                combined.append({
-                    'date': tx['created'],
-                    'sort_key': (tx['created'], 0),  # Gross first
-                    'party': party_name,
-                    'nature': 'Gross Charge',
-                    'description': product_desc,
-                    'debit': gross_val if gross_val > 0 else 0,
-                    'credit': 0,
-                    'gross': gross_val,
-                    'fee': 0,
-                    'net': gross_val,  # Gross row adds the full gross
-                    'balance_transaction_id': tx.get('balance_transaction_id'),
-                    'created': tx['created'],
-                    'currency': tx.get('currency', 'HKD'),
-                    'reporting_category': 'charge',
-                    'acknowledged': 'No',
-                    'type': 'activity'
-                })
-                # Row 2: Processing Fee (Credit = fee amount)
-                if fee_val > 0:
-                    combined.append({
-                        'date': tx['created'],
-                        'sort_key': (tx['created'], 1),  # Fee after gross
-                        'party': 'Stripe',
-                        'nature': 'Processing Fee',
-                        'description': f'Processing fee for',
-                        'debit': 0,
-                        'credit': fee_val,
-                        'gross': 0,
-                        'fee': fee_val,
-                        'net': -fee_val,  # Fee row subtracts the fee
-                        'balance_transaction_id': tx.get('balance_transaction_id'),
-                        'created': tx['created'],
-                        'currency': tx.get('currency', 'HKD'),
-                        'reporting_category': 'fee',
-                        'acknowledged': 'No',
-                        'type': 'activity'
-                    })
-            elif category == 'refund':
-                # Refund: Credit = refund amount (money going out)
-                combined.append({
-                    'date': tx['created'],
-                    'sort_key': (tx['created'], 0),
-                    'party': party_name,
-                    'nature': 'Refund',
-                    'description': 'Refund',
-                    'debit': 0,
-                    'credit': abs(gross_val),
-                    'gross': gross_val,
-                    'fee': fee_val,
-                    'net': tx.get('net', gross_val + fee_val),
-                    'balance_transaction_id': tx.get('balance_transaction_id'),
-                    'created': tx['created'],
-                    'currency': tx.get('currency', 'HKD'),
-                    'reporting_category': 'refund',
-                    'acknowledged': 'No',
-                    'type': 'activity'
-                })
-            else:
-                # Other activity types
-                nature = category.title() if category else 'Activity'
-                combined.append({
-                    'date': tx['created'],
-                    'sort_key': (tx['created'], 0),
-                    'party': party_name,
-                    'nature': nature,
-                    'description': tx.get('description', '') or nature,
-                    'debit': gross_val if gross_val > 0 else 0,
-                    'credit': fee_val if fee_val > 0 else (abs(gross_val) if gross_val < 0 else 0),
-                    'gross': gross_val,
-                    'fee': fee_val,
-                    'net': tx.get('net', 0),
-                    'balance_transaction_id': tx.get('balance_transaction_id'),
-                    'created': tx['created'],
-                    'currency': tx.get('currency', 'HKD'),
-                    'reporting_category': category,
-                    'acknowledged': 'No',
-                    'type': 'activity'
-                })
+            totals = activity_totals.get(category)
+            if totals is not None:
+                totals[0] += 1
+                totals[1] += _to_cents(gross_val)
+                totals[2] += _to_cents(fee_val)
+                totals[3] += _to_cents(tx.get('net', 0))
+
+            build_rows = self._ACTIVITY_ROW_BUILDERS.get(category, CompleteCsvService._other_activity_rows)
+            rows = build_rows(self, tx, category, party_name, product_desc, gross_val, fee_val)
+            gross_row_party[id(rows[0])] = party_info
+            combined.extend(rows)
 
         for tx in payout_transactions:
             # Payouts are money going out = Credit (per sample: Party="STRIPE PAYOUT", Nature="Payout")
@@ -1684,7 +2565,7 @@ class CompleteCsvService:
                     })
                 else:
                     # This is a gross charge row
-                    combined.append({
+                    row = {
                         'date': tx_datetime,
                         'sort_key': (tx_datetime, 0),  # Gross first
                         'party': customer_name,
@@ -1702,21 +2583,40 @@ class CompleteCsvService:
                         'acknowledged': 'No',
                         'type': 'activity',
                         'source': 'unified_file'
-                    })
+                    }
+                    gross_row_party[id(row)] = party_lookup.get(tx_date, float(gross_val))
+                    combined.append(row)
 
         # Sort by date
-        combined.sort(key=lambda x: x['sort_key'])
+        combined = _sort_by_sort_key(combined)
 
-        # Calculate running balance
+        # Pull the numeric fields out of the sorted rows in one pass, as
+        # columns (net in integer cents for the running balance)
+        net_cents = []
+        debits = []
+        credits = []
         for tx in combined:
-            net = Decimal(str(tx.get('net', 0)))
-            running_balance += net
-            tx['balance'] = float(running_balance)
-            all_transactions.append(tx)
+            net_cents.append(_to_cents(tx.get('net', 0)))
+            debits.append(float(tx.get('debit', 0)))
+            credits.append(float(tx.get('credit', 0)))
 
-        # Calculate SUBTOTAL of all debits and credits
-        total_debit = sum(float(tx.get('debit', 0)) for tx in combined)
-        total_credit = sum(float(tx.get('credit', 0)) for tx in combined)
+        # Calculate running balance
+        opening_cents = _to_cents(opening_balance)
+        if np is not None:
+            balances = ((opening_cents + np.cumsum(np.array(net_cents, dtype=np.int64))) / 100).tolist()
+        else:
+            balances = []
+            running_cents = opening_cents
+            for cents in net_cents:
+                running_cents += cents
+                balances.append(running_cents / 100)
+        for tx, balance in zip(combined, balances):
+            tx['balance'] = balance
+        all_transactions.extend(combined)
+
+        # Calculate SUBTOTAL of all debits and credits (summed in row order, as floats)
+        total_debit = sum(debits)
+        total_credit = sum(credits)
 
         # Add SUBTOTAL row (per sample format)
         all_transactions.append({
@@ -1738,7 +2638,7 @@ class CompleteCsvService:
         # Add closing balance entry (per sample: Nature="Closing Balance", Party="Carry Forward", Credit=amount)
         # Use Stripe's ending balance + any supplement activity
         stripe_ending_balance = Decimal(str(balance_summary.get('ending_balance', 0)))
-        closing_balance = stripe_ending_balance + supplement_activity_net
+        closing_balance = stripe_ending_balance + Decimal(supplement_activity_net) / 100
         all_transactions.append({
             'date': end_date,
             'type': 'closing_balance',
@@ -1755,23 +2655,23 @@ class CompleteCsvService:
             'category': 'balance'
         })
 
-        # Summary statistics
-        charges = [tx for tx in activity_transactions if tx.get('reporting_category') == 'charge']
-        refunds = [tx for tx in activity_transactions if tx.get('reporting_category') == 'refund']
+        charge_count, charge_gross, charge_fees, charge_net = activity_totals['charge']
+        refund_count, refund_gross, refund_fees, refund_net = activity_totals['refund']
 
         # Include supplement in activity totals
-        total_activity_gross = Decimal(str(balance_summary.get('activity', {}).get('gross', 0))) + supplement_activity_gross
-        total_activity_fee = Decimal(str(balance_summary.get('activity', {}).get('fee', 0))) - supplement_activity_fee  # fee is negative
-        total_activity_net = Decimal(str(balance_summary.get('activity', {}).get('net', 0))) + supplement_activity_net
+        total_activity_gross = Decimal(str(balance_summary.get('activity', {}).get('gross', 0))) + Decimal(supplement_activity_gross) / 100
+        total_activity_fee = Decimal(str(balance_summary.get('activity', {}).get('fee', 0))) - Decimal(supplement_activity_fee) / 100  # fee is negative
+        total_activity_net = Decimal(str(balance_summary.get('activity', {}).get('net', 0))) + Decimal(supplement_activity_net) / 100
 
         # Count supplement charges
-        supplement_charges = [tx for tx in supplement_transactions if tx.get('type') in ['charge', 'payment'] and not tx.get('is_fee')]
+        supplement_charges = [tx for tx in supplement_transactions if tx.get('type') in _CHARGE_TYPES and not tx.get('is_fee')]
 
         # Build Sales Transaction Details from party_lookup (only Gross Charge transactions)
         sales_details = []
         sale_number = 0
-        for tx in all_transactions:
-            if tx.get('nature') == 'Gross Charge' and tx.get('type') != 'subtotal':
+        # (the opening, subtotal and closing rows are never Gross Charges)
+        for tx in combined:
+            if tx['nature'] == 'Gross Charge':
                 tx_date = tx.get('created') or tx.get('date')
                 gross_amount = float(tx.get('gross', 0))
 
@@ -1781,29 +2681,12 @@ class CompleteCsvService:
                     if hasattr(tx_date, 'date'):
                         date_key = tx_date.date()
                     elif isinstance(tx_date, str):
-                        # Handle various date string formats
-                        from datetime import datetime as dt
-                        try:
-                            if 'T' in tx_date:
-                                # ISO format with T: "2025-11-02T12:00:00Z"
-                                date_key = dt.fromisoformat(tx_date.replace('Z', '+00:00')).date()
-                            elif tx_date[:4].isdigit():
-                                # ISO format: "2025-11-02"
-                                date_key = dt.strptime(tx_date[:10], '%Y-%m-%d').date()
-                            elif ',' in tx_date:
-                                # HTTP date format: "Sun, 02 Nov 2025 03:19:33 GMT"
-                                date_key = dt.strptime(tx_date, '%a, %d %b %Y %H:%M:%S %Z').date()
-                            else:
-                                date_key = None
-                        except:
-                            date_key = None
+                        date_key = _date_from_string(tx_date)
                     else:
                         date_key = tx_date
 
-                # Look up party info
-                party_info = None
-                if date_key:
-                    party_info = party_lookup.get((date_key, gross_amount)) or party_lookup.get((date_key, round(gross_amount, 2)))
+                # Party info was looked up when the row was built
+                party_info = gross_row_party[id(tx)]
 
                 # Always add a sale entry, using party_info if available, else use tx data
                 sale_number += 1
@@ -1875,16 +2758,16 @@ class CompleteCsvService:
                 'closing_balance': float(closing_balance)
             },
             'statistics': {
-                'charge_count': len(charges) + len(supplement_charges),
-                'charge_gross': float(sum(Decimal(str(tx.get('gross', 0))) for tx in charges) + supplement_activity_gross),
-                'charge_fees': float(sum(Decimal(str(tx.get('fee', 0))) for tx in charges) + supplement_activity_fee),
-                'charge_net': float(sum(Decimal(str(tx.get('net', 0))) for tx in charges) + supplement_activity_net),
-                'refund_count': len(refunds),
-                'refund_gross': float(sum(Decimal(str(tx.get('gross', 0))) for tx in refunds)),
-                'refund_fees': float(sum(Decimal(str(tx.get('fee', 0))) for tx in refunds)),
-                'refund_net': float(sum(Decimal(str(tx.get('net', 0))) for tx in refunds)),
+                'charge_count': charge_count + len(supplement_charges),
+                'charge_gross': (charge_gross + supplement_activity_gross) / 100,
+                'charge_fees': (charge_fees + supplement_activity_fee) / 100,
+                'charge_net': (charge_net + supplement_activity_net) / 100,
+                'refund_count': refund_count,
+                'refund_gross': refund_gross / 100,
+                'refund_fees': refund_fees / 100,
+                'refund_net': refund_net / 100,
                 'payout_count': len(payout_transactions),
-                'payout_total': float(sum(Decimal(str(tx.get('net', 0))) for tx in payout_transactions)),
+                'payout_total': sum(_to_cents(tx.get('net', 0)) for tx in payout_transactions) / 100,
                 'supplement_transaction_count': len(supplement_transactions)
             },
             'transactions': all_transactions,
@@ -1895,6 +2778,99 @@ class CompleteCsvService:
             'source': 'stripe_reports' + ('_with_supplement' if supplement_transactions else '')
         }
 
+    def _charge_activity_rows(self, tx, category, party_name, product_desc, gross_val, fee_val):
+        """Statement rows for an itemised charge: Gross Charge, then Processing Fee if any"""
+        # Row 1: Gross Charge (Debit = gross amount)
+        rows = [{
+            'date': tx['created'],
+            'sort_key': (tx['created'], 0),  # Gross first
+            'party': party_name,
+            'nature': 'Gross Charge',
+            'description': product_desc,
+            'debit': gross_val if gross_val > 0 else 0,
+            'credit': 0,
+            'gross': gross_val,
+            'fee': 0,
+            'net': gross_val,  # Gross row adds the full gross
+            'balance_transaction_id': tx.get('balance_transaction_id'),
+            'created': tx['created'],
+            'currency': tx.get('currency', 'HKD'),
+            'reporting_category': 'charge',
+            'acknowledged': 'No',
+            'type': 'activity'
+        }]
+        # Row 2: Processing Fee (Credit = fee amount)
+        if fee_val > 0:
+            rows.append({
+                'date': tx['created'],
+                'sort_key': (tx['created'], 1),  # Fee after gross
+                'party': 'Stripe',
+                'nature': 'Processing Fee',
+                'description': f'Processing fee for',
+                'debit': 0,
+                'credit': fee_val,
+                'gross': 0,
+                'fee': fee_val,
+                'net': -fee_val,  # Fee row subtracts the fee
+                'balance_transaction_id': tx.get('balance_transaction_id'),
+                'created': tx['created'],
+                'currency': tx.get('currency', 'HKD'),
+                'reporting_category': 'fee',
+                'acknowledged': 'No',
+                'type': 'activity'
+            })
+        return rows
+
+    def _refund_activity_rows(self, tx, category, party_name, product_desc, gross_val, fee_val):
+        """Statement row for an itemised refund (Credit = refund amount, money going out)"""
+        return [{
+            'date': tx['created'],
+            'sort_key': (tx['created'], 0),
+            'party': party_name,
+            'nature': 'Refund',
+            'description': 'Refund',
+            'debit': 0,
+            'credit': abs(gross_val),
+            'gross': gross_val,
+            'fee': fee_val,
+            'net': tx.get('net', gross_val + fee_val),
+            'balance_transaction_id': tx.get('balance_transaction_id'),
+            'created': tx['created'],
+            'currency': tx.get('currency', 'HKD'),
+            'reporting_category': 'refund',
+            'acknowledged': 'No',
+            'type': 'activity'
+        }]
+
+    def _other_activity_rows(self, tx, category, party_name, product_desc, gross_val, fee_val):
+        """Statement row for any other itemised activity type"""
+        nature = category.title() if category else 'Activity'
+        return [{
+            'date': tx['created'],
+            'sort_key': (tx['created'], 0),
+            'party': party_name,
+            'nature': nature,
+            'description': tx.get('description', '') or nature,
+            'debit': gross_val if gross_val > 0 else 0,
+            'credit': fee_val if fee_val > 0 else (abs(gross_val) if gross_val < 0 else 0),
+            'gross': gross_val,
+            'fee': fee_val,
+            'net': tx.get('net', 0),
+            'balance_transaction_id': tx.get('balance_transaction_id'),
+            'created': tx['created'],
+            'currency': tx.get('currency', 'HKD'),
+            'reporting_category': category,
+            'acknowledged': 'No',
+            'type': 'activity'
+        }]
+
+    # reporting_category -> row builder for generate_monthly_statement_from_stripe_reports
+    # (anything else goes through _other_activity_rows)
+    _ACTIVITY_ROW_BUILDERS = {
+        'charge': _charge_activity_rows,
+        'refund': _refund_activity_rows,
+    }
+
     def _read_stripe_itemised_activity(self, year, month, company_filter, start_date, end_date):
         """Read itemised balance change from activity CSV file"""
         # First, try to find balance_history.csv file (new format)
@@ -1909,18 +2885,17 @@ class CompleteCsvService:
             file_path = os.path.join(data_dir, pattern)
             if os.path.exists(file_path):
                 self.logger.info(f"Found balance_history file: {file_path}")
-                return self._parse_balance_history_csv(file_path, start_date, end_date)
+                return self._cached_report(self._parse_balance_history_csv, file_path, start_date, end_date)
 
             # Check in root directory
             file_path = os.path.join(self.root_directory, pattern)
             if os.path.exists(file_path):
                 self.logger.info(f"Found balance_history file: {file_path}")
-                return self._parse_balance_history_csv(file_path, start_date, end_date)
+                return self._cached_report(self._parse_balance_history_csv, file_path, start_date, end_date)
 
         # Fall back to original Itemised_balance_change format
         pattern = f"{company_filter}_Itemised_balance_change_from_activity_*.csv"
-        search_path = os.path.join(self.root_directory, pattern)
-        files = glob.glob(search_path)
+        files = self._find_root_files(pattern)
 
         if not files:
             return []
@@ -1929,114 +2904,119 @@ class CompleteCsvService:
         for file_path in files:
             filename = os.path.basename(file_path)
             if f"{year}-{month:02d}" in filename:
-                return self._parse_stripe_itemised_activity(file_path)
+                return self._cached_report(self._parse_stripe_itemised_activity, file_path)
 
         return []
 
+    def _iter_balance_history_rows(self, file_path, start_date, end_date, payouts=False):
+        """
+        Yield balance_history rows like _iter_csv_rows.
+
+        With pandas, rows dated outside start_date..end_date are dropped per
+        chunk in vectorised string operations, before any row dicts are
+        built, along with payouts (or, with payouts=True, everything but
+        payouts). Undated or unusually formatted rows are kept for the
+        caller's own checks, so both paths give the same transactions.
+        """
+        if pd is None:
+            yield from self._iter_csv_rows(file_path, BALANCE_HISTORY_COLUMNS)
+            return
+
+        start, end = start_date.isoformat(), end_date.isoformat()
+        for chunk in self._iter_csv_chunks(file_path, BALANCE_HISTORY_COLUMNS):
+            if 'Created (UTC)' in chunk:
+                created = chunk['Created (UTC)'].str.strip()
+                # ISO timestamps compare like their dates on the first 10 characters
+                keep = created.str[:10].between(start, end) | ~created.str.match(r'\d{4}-\d{2}-\d{2}')
+                if 'Type' in chunk:
+                    is_payout = chunk['Type'].str.strip().str.lower() == 'payout'
+                    keep &= is_payout if payouts else ~is_payout
+                chunk = chunk[keep]
+            yield from chunk.to_dict(orient='records')
+
     def _parse_balance_history_csv(self, file_path, start_date, end_date):
         """Parse the new balance_history.csv format (Stripe Balance History export)"""
         transactions = []
+        start_date_cmp = start_date.date() if hasattr(start_date, 'date') else start_date
+        end_date_cmp = end_date.date() if hasattr(end_date, 'date') else end_date
+        category_map = self._BALANCE_HISTORY_CATEGORIES
 
         try:
-            with open(file_path, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+            # Only the columns used below are read (through pandas/PyArrow when installed)
+            for row in self._iter_balance_history_rows(file_path, start_date_cmp, end_date_cmp):
+                # Parse created date - format: "2025-12-24 02:52"
+                created_str = row.get('Created (UTC)', '').strip()
+                created = None
+                if created_str:
+                    created = _fast_parse_dt(created_str)
+                    if created is None:
+                        continue
 
-                for row in reader:
-                    # Parse created date - format: "2025-12-24 02:52"
-                    created_str = row.get('Created (UTC)', '').strip()
-                    created = None
-                    if created_str:
-                        try:
-                            created = datetime.strptime(created_str, '%Y-%m-%d %H:%M')
-                        except ValueError:
-                            try:
-                                created = datetime.strptime(created_str, '%Y-%m-%d %H:%M:%S')
-                            except ValueError:
-                                continue
-
-                    # Filter by date range
-                    if created:
-                        created_date = created.date()
-                        start_date_cmp = start_date.date() if hasattr(start_date, 'date') else start_date
-                        end_date_cmp = end_date.date() if hasattr(end_date, 'date') else end_date
-                        if created_date < start_date_cmp or created_date > end_date_cmp:
-                            continue
+                # Filter by date range
+                if created:
+                    created_date = created.date()
+                    if created_date < start_date_cmp or created_date > end_date_cmp:
+                        continue
 
-                    # Parse available_on date
-                    available_str = row.get('Available On (UTC)', '').strip()
-                    available_on = None
-                    if available_str:
-                        try:
-                            available_on = datetime.strptime(available_str, '%Y-%m-%d %H:%M')
-                        except ValueError:
-                            try:
-                                available_on = datetime.strptime(available_str, '%Y-%m-%d %H:%M:%S')
-                            except ValueError:
-                                pass
-
-                    # Parse amounts
-                    amount = self._parse_decimal(row.get('Amount', '0'))
-                    fee = self._parse_decimal(row.get('Fee', '0'))
-                    net = self._parse_decimal(row.get('Net', '0'))
-
-                    # Get transaction type and map to reporting_category
-                    tx_type = row.get('Type', '').strip().lower()
-
-                    # Map Type to reporting_category
-                    category_map = {
-                        'payment': 'charge',
-                        'charge': 'charge',
-                        'payment_refund': 'refund',
-                        'refund': 'refund',
-                        'payout': 'payout',
-                    }
-                    reporting_category = category_map.get(tx_type, tx_type)
+                # Parse available_on date
+                available_on = _fast_parse_dt(row.get('Available On (UTC)', '').strip())
 
-                    # Skip payouts - they're handled separately
-                    if tx_type == 'payout':
-                        continue
+                # Parse amounts
+                amount = self._parse_money(row.get('Amount', '0'))
+                fee = self._parse_money(row.get('Fee', '0'))
+                net = self._parse_money(row.get('Net', '0'))
 
-                    # Get description and customer info
-                    description = row.get('Description', '').strip()
-                    customer_email = row.get('Customer Email', '').strip()
-                    customer_name = row.get('3. User name (metadata)', '').strip()
-                    site = row.get('1. Site (metadata)', '').strip()
-
-                    # Get original amount info
-                    customer_amount = row.get('Customer Facing Amount', '').strip()
-                    customer_currency = row.get('Customer Facing Currency', '').strip()
-
-                    # Get subscription/product info
-                    product_name = row.get('4. Product name (metadata)', '').strip()
-                    subs_type = row.get('subs_type (metadata)', '').strip()
-                    plan_days = row.get('plan_days (metadata)', '').strip()
-                    active_date = row.get('4. Active date (metadata)', '') or row.get('3. Active date (metadata)', '')
-                    expiry_date = row.get('5. Expiry date (metadata)', '') or row.get('4. Expiry date (metadata)', '')
-
-                    transactions.append({
-                        'balance_transaction_id': row.get('id', '').strip(),
-                        'source_id': row.get('Source', '').strip(),
-                        'created': created,
-                        'available_on': available_on,
-                        'currency': row.get('Currency', 'hkd').strip().upper(),
-                        'gross': float(amount),  # Amount is gross
-                        'fee': float(fee),
-                        'net': float(net),
-                        'reporting_category': reporting_category,
-                        'description': description,
-                        'type': 'activity',
-                        # Additional metadata for sales details
-                        'customer_email': customer_email,
-                        'customer_name': customer_name,
-                        'site': site,
-                        'customer_amount': customer_amount,
-                        'customer_currency': customer_currency,
-                        'product_name': product_name,
-                        'subs_type': subs_type,
-                        'plan_days': plan_days,
-                        'active_date': active_date.strip() if active_date else '',
-                        'expiry_date': expiry_date.strip() if expiry_date else '',
-                    })
+                # Get transaction type and map to reporting_category
+                tx_type = _report_code(row.get('Type', ''))
+
+                # Map Type to reporting_category
+                reporting_category = sys.intern(category_map.get(tx_type, tx_type))
+
+                # Skip payouts - they're handled separately
+                if tx_type == 'payout':
+                    continue
+
+                # Get description and customer info
+                description = row.get('Description', '').strip()
+                customer_email = row.get('Customer Email', '').strip()
+                customer_name = row.get('3. User name (metadata)', '').strip()
+                site = row.get('1. Site (metadata)', '').strip()
+
+                # Get original amount info
+                customer_amount = row.get('Customer Facing Amount', '').strip()
+                customer_currency = row.get('Customer Facing Currency', '').strip()
+
+                # Get subscription/product info
+                product_name = row.get('4. Product name (metadata)', '').strip()
+                subs_type = row.get('subs_type (metadata)', '').strip()
+                plan_days = row.get('plan_days (metadata)', '').strip()
+                active_date = row.get('4. Active date (metadata)', '') or row.get('3. Active date (metadata)', '')
+                expiry_date = row.get('5. Expiry date (metadata)', '') or row.get('4. Expiry date (metadata)', '')
+
+                transactions.append({
+                    'balance_transaction_id': row.get('id', '').strip(),
+                    'source_id': row.get('Source', '').strip(),
+                    'created': created,
+                    'available_on': available_on,
+                    'currency': _report_code(row.get('Currency', 'hkd'), upper=True),
+                    'gross': amount,  # Amount is gross
+                    'fee': fee,
+                    'net': net,
+                    'reporting_category': reporting_category,
+                    'description': description,
+                    'type': 'activity',
+                    # Additional metadata for sales details
+                    'customer_email': customer_email,
+                    'customer_name': customer_name,
+                    'site': site,
+                    'customer_amount': customer_amount,
+                    'customer_currency': customer_currency,
+                    'product_name': product_name,
+                    'subs_type': subs_type,
+                    'plan_days': plan_days,
+                    'active_date': active_date.strip() if active_date else '',
+                    'expiry_date': expiry_date.strip() if expiry_date else '',
+                })
 
         except Exception as e:
             self.logger.error(f"Error parsing balance_history CSV: {e}")
@@ -2048,52 +3028,40 @@ class CompleteCsvService:
         transactions = []
 
         try:
-            with open(file_path, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+            # Only the columns used below are read (through pandas/PyArrow when installed)
+            for row in self._iter_csv_rows(file_path, ITEMISED_ACTIVITY_COLUMNS):
+                # Parse created date
+                created_str = row.get('created', '').strip()
+                created = None
+                if created_str:
+                    created = _strptime_by_length(created_str, '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M')
+                    if created is None:
+                        continue
 
-                for row in reader:
-                    # Parse created date
-                    created_str = row.get('created', '').strip()
-                    created = None
-                    if created_str:
-                        try:
-                            created = datetime.strptime(created_str, '%Y-%m-%d %H:%M:%S')
-                        except ValueError:
-                            try:
-                                created = datetime.strptime(created_str, '%Y-%m-%d %H:%M')
-                            except ValueError:
-                                continue
-
-                    # Parse available_on date
-                    available_str = row.get('available_on', '').strip()
-                    available_on = None
-                    if available_str:
-                        try:
-                            available_on = datetime.strptime(available_str, '%Y-%m-%d %H:%M:%S')
-                        except ValueError:
-                            try:
-                                available_on = datetime.strptime(available_str, '%Y-%m-%d %H:%M')
-                            except ValueError:
-                                pass
-
-                    gross = self._parse_decimal(row.get('gross', '0'))
-                    fee = self._parse_decimal(row.get('fee', '0'))
-                    net = self._parse_decimal(row.get('net', '0'))
-                    category = row.get('reporting_category', '').strip()
-                    description = row.get('description', '').strip()
-
-                    transactions.append({
-                        'balance_transaction_id': row.get('balance_transaction_id', '').strip(),
-                        'created': created,
-                        'available_on': available_on,
-                        'currency': row.get('currency', 'hkd').strip().upper(),
-                        'gross': float(gross),
-                        'fee': float(fee),
-                        'net': float(net),
-                        'reporting_category': category,
-                        'description': description,
-                        'type': 'activity'
-                    })
+                # Parse available_on date
+                available_str = row.get('available_on', '').strip()
+                available_on = None
+                if available_str:
+                    available_on = _strptime_by_length(available_str, '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M')
+
+                gross = self._parse_money(row.get('gross', '0'))
+                fee = self._parse_money(row.get('fee', '0'))
+                net = self._parse_money(row.get('net', '0'))
+                category = sys.intern(row.get('reporting_category', '').strip())
+                description = row.get('description', '').strip()
+
+                transactions.append({
+                    'balance_transaction_id': row.get('balance_transaction_id', '').strip(),
+                    'created': created,
+                    'available_on': available_on,
+                    'currency': _report_code(row.get('currency', 'hkd'), upper=True),
+                    'gross': gross,
+                    'fee': fee,
+                    'net': net,
+                    'reporting_category': category,
+                    'description': description,
+                    'type': 'activity'
+                })
 
         except Exception as e:
             self.logger.error(f"Error parsing Stripe Itemised Activity: {e}")
@@ -2114,18 +3082,17 @@ class CompleteCsvService:
             file_path = os.path.join(data_dir, pattern)
             if os.path.exists(file_path):
                 self.logger.info(f"Extracting payouts from balance_history file: {file_path}")
-                return self._parse_payouts_from_balance_history(file_path, start_date, end_date)
+                return self._cached_report(self._parse_payouts_from_balance_history, file_path, start_date, end_date)
 
             # Check in root directory
             file_path = os.path.join(self.root_directory, pattern)
             if os.path.exists(file_path):
                 self.logger.info(f"Extracting payouts from balance_history file: {file_path}")
-                return self._parse_payouts_from_balance_history(file_path, start_date, end_date)
+                return self._cached_report(self._parse_payouts_from_balance_history, file_path, start_date, end_date)
 
         # Fall back to original Itemised_payouts format
         pattern = f"{company_filter}_Itemised_payouts_*.csv"
-        search_path = os.path.join(self.root_directory, pattern)
-        files = glob.glob(search_path)
+        files = self._find_root_files(pattern)
 
         if not files:
             return []
@@ -2133,61 +3100,55 @@ class CompleteCsvService:
         for file_path in files:
             filename = os.path.basename(file_path)
             if f"{year}-{month:02d}" in filename:
-                return self._parse_stripe_itemised_payouts_detail(file_path)
+                return self._cached_report(self._parse_stripe_itemised_payouts_detail, file_path)
 
         return []
 
     def _parse_payouts_from_balance_history(self, file_path, start_date, end_date):
         """Extract payout transactions from balance_history.csv"""
         payouts = []
+        start_date_cmp = start_date.date() if hasattr(start_date, 'date') else start_date
+        end_date_cmp = end_date.date() if hasattr(end_date, 'date') else end_date
 
         try:
-            with open(file_path, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+            # Non-payout and out-of-range rows are dropped in bulk when pandas is installed
+            for row in self._iter_balance_history_rows(file_path, start_date_cmp, end_date_cmp, payouts=True):
+                # Only process payout transactions
+                tx_type = _report_code(row.get('Type', ''))
+                if tx_type != 'payout':
+                    continue
 
-                for row in reader:
-                    # Only process payout transactions
-                    tx_type = row.get('Type', '').strip().lower()
-                    if tx_type != 'payout':
+                # Parse created date
+                created_str = row.get('Created (UTC)', '').strip()
+                created = None
+                if created_str:
+                    created = _strptime_by_length(created_str, '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M')
+                    if created is None:
                         continue
 
-                    # Parse created date
-                    created_str = row.get('Created (UTC)', '').strip()
-                    created = None
-                    if created_str:
-                        try:
-                            created = datetime.strptime(created_str, '%Y-%m-%d %H:%M')
-                        except ValueError:
-                            try:
-                                created = datetime.strptime(created_str, '%Y-%m-%d %H:%M:%S')
-                            except ValueError:
-                                continue
-
-                    # Filter by date range
-                    if created:
-                        created_date = created.date()
-                        start_date_cmp = start_date.date() if hasattr(start_date, 'date') else start_date
-                        end_date_cmp = end_date.date() if hasattr(end_date, 'date') else end_date
-                        if created_date < start_date_cmp or created_date > end_date_cmp:
-                            continue
+                # Filter by date range
+                if created:
+                    created_date = created.date()
+                    if created_date < start_date_cmp or created_date > end_date_cmp:
+                        continue
 
-                    # Parse amounts (payouts have negative amounts)
-                    amount = self._parse_decimal(row.get('Amount', '0'))
-                    fee = self._parse_decimal(row.get('Fee', '0'))
-                    net = self._parse_decimal(row.get('Net', '0'))
-
-                    payouts.append({
-                        'payout_id': row.get('Source', '').strip(),
-                        'balance_transaction_id': row.get('id', '').strip(),
-                        'effective_at': created,
-                        'arrival_date': created.date() if created else None,
-                        'currency': row.get('Currency', 'hkd').strip().upper(),
-                        'gross': float(amount),
-                        'fee': float(fee),
-                        'net': float(net),
-                        'description': row.get('Description', '').strip() or 'STRIPE PAYOUT',
-                        'type': 'payout'
-                    })
+                # Parse amounts (payouts have negative amounts)
+                amount = self._parse_money(row.get('Amount', '0'))
+                fee = self._parse_money(row.get('Fee', '0'))
+                net = self._parse_money(row.get('Net', '0'))
+
+                payouts.append({
+                    'payout_id': row.get('Source', '').strip(),
+                    'balance_transaction_id': row.get('id', '').strip(),
+                    'effective_at': created,
+                    'arrival_date': created.date() if created else None,
+                    'currency': _report_code(row.get('Currency', 'hkd'), upper=True),
+                    'gross': amount,
+                    'fee': fee,
+                    'net': net,
+                    'description': row.get('Description', '').strip() or 'STRIPE PAYOUT',
+                    'type': 'payout'
+                })
 
         except Exception as e:
             self.logger.error(f"Error extracting payouts from balance_history: {e}")
@@ -2199,52 +3160,42 @@ class CompleteCsvService:
         payouts = []
 
         try:
-            with open(file_path, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
+            # Only the columns used below are read (through pandas/PyArrow when installed)
+            for row in self._iter_csv_rows(file_path, ITEMISED_PAYOUT_COLUMNS):
+                # Parse effective_at date
+                effective_str = row.get('effective_at', '').strip()
+                effective_at = None
+                if effective_str:
+                    effective_at = _strptime_by_length(effective_str, '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M')
+                    if effective_at is None:
+                        continue
 
-                for row in reader:
-                    # Parse effective_at date
-                    effective_str = row.get('effective_at', '').strip()
-                    effective_at = None
-                    if effective_str:
-                        try:
-                            effective_at = datetime.strptime(effective_str, '%Y-%m-%d %H:%M:%S')
-                        except ValueError:
-                            try:
-                                effective_at = datetime.strptime(effective_str, '%Y-%m-%d %H:%M')
-                            except ValueError:
-                                continue
-
-                    # Parse arrival date
-                    arrival_str = row.get('payout_expected_arrival_date', '').strip()
-                    arrival_date = None
-                    if arrival_str:
-                        try:
-                            arrival_date = datetime.strptime(arrival_str, '%Y-%m-%d %H:%M:%S').date()
-                        except ValueError:
-                            try:
-                                arrival_date = datetime.strptime(arrival_str, '%Y-%m-%d').date()
-                            except ValueError:
-                                pass
-
-                    gross = self._parse_decimal(row.get('gross', '0'))
-                    fee = self._parse_decimal(row.get('fee', '0'))
-                    net = self._parse_decimal(row.get('net', '0'))
-
-                    payouts.append({
-                        'payout_id': row.get('payout_id', '').strip(),
-                        'balance_transaction_id': row.get('balance_transaction_id', '').strip(),
-                        'effective_at': effective_at,
-                        'arrival_date': arrival_date,
-                        'currency': row.get('currency', 'hkd').strip().upper(),
-                        'gross': float(-gross),  # Negative because money leaves balance
-                        'fee': float(fee),
-                        'net': float(-net),  # Negative because money leaves balance
-                        'status': row.get('payout_status', '').strip(),
-                        'description': row.get('description', '').strip(),
-                        'reporting_category': 'payout',
-                        'type': 'payout'
-                    })
+                # Parse arrival date
+                arrival_str = row.get('payout_expected_arrival_date', '').strip()
+                arrival_date = None
+                if arrival_str:
+                    arrival_at = _strptime_by_length(arrival_str, '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+                    if arrival_at is not None:
+                        arrival_date = arrival_at.date()
+
+                gross = self._parse_money(row.get('gross', '0'))
+                fee = self._parse_money(row.get('fee', '0'))
+                net = self._parse_money(row.get('net', '0'))
+
+                payouts.append({
+                    'payout_id': row.get('payout_id', '').strip(),
+                    'balance_transaction_id': row.get('balance_transaction_id', '').strip(),
+                    'effective_at': effective_at,
+                    'arrival_date': arrival_date,
+                    'currency': _report_code(row.get('currency', 'hkd'), upper=True),
+                    'gross': -gross,  # Negative because money leaves balance
+                    'fee': fee,
+                    'net': -net,  # Negative because money leaves balance
+                    'status': row.get('payout_status', '').strip(),
+                    'description': row.get('description', '').strip(),
+                    'reporting_category': 'payout',
+                    'type': 'payout'
+                })
 
         except Exception as e:
             self.logger.error(f"Error parsing Stripe Itemised Payouts: {e}")
@@ -2255,8 +3206,7 @@ class CompleteCsvService:
         """Read payouts from Stripe's Itemised Payouts CSV file if available"""
         # Look for files like: cgge_Itemised_payouts_HKD_2025-11-01_to_2025-11-29_UTC.csv
         pattern = f"{company_filter}_Itemised_payouts_*.csv"
-        search_path = os.path.join(self.root_directory, pattern)
-        files = glob.glob(search_path)
+        files = self._find_root_files(pattern)
 
         if not files:
             return {'gross': 0, 'fee': 0, 'count': 0}
@@ -2265,48 +3215,41 @@ class CompleteCsvService:
         for file_path in files:
             filename = os.path.basename(file_path)
             if f"{year}-{month:02d}" in filename:
-                return self._parse_stripe_itemised_payouts(file_path, start_date, end_date)
+                return self._cached_report(self._parse_stripe_itemised_payouts, file_path, start_date, end_date)
 
         return {'gross': 0, 'fee': 0, 'count': 0}
 
     def _parse_stripe_itemised_payouts(self, file_path, start_date, end_date):
         """Parse Stripe's Itemised Payouts CSV format"""
         try:
-            total_gross = Decimal('0')
-            total_fee = Decimal('0')
+            # Totals in integer cents; only the float totals are returned
+            total_gross = 0
+            total_fee = 0
             count = 0
 
-            with open(file_path, 'r', newline='', encoding='utf-8') as file:
-                reader = csv.DictReader(file)
-
-                for row in reader:
-                    # Parse effective_at date
-                    effective_str = row.get('effective_at', '').strip()
-                    if not effective_str:
-                        continue
-
-                    try:
-                        effective_date = datetime.strptime(effective_str, '%Y-%m-%d %H:%M:%S').date()
-                    except ValueError:
-                        try:
-                            effective_date = datetime.strptime(effective_str, '%Y-%m-%d').date()
-                        except ValueError:
-                            continue
+            # Only the columns used below are read (through pandas/PyArrow when installed)
+            for row in self._iter_csv_rows(file_path, ITEMISED_PAYOUT_COLUMNS):
+                # Parse effective_at date
+                effective_str = row.get('effective_at', '').strip()
+                if not effective_str:
+                    continue
 
-                    # Check if within date range
-                    if effective_date < start_date or effective_date > end_date:
-                        continue
+                effective_at = _strptime_by_length(effective_str, '%Y-%m-%d %H:%M:%S', '%Y-%m-%d')
+                if effective_at is None:
+                    continue
+                effective_date = effective_at.date()
 
-                    gross = self._parse_decimal(row.get('gross', '0'))
-                    fee = self._parse_decimal(row.get('fee', '0'))
+                # Check if within date range
+                if effective_date < start_date or effective_date > end_date:
+                    continue
 
-                    total_gross += gross
-                    total_fee += fee
-                    count += 1
+                total_gross += _to_cents(self._parse_money(row.get('gross', '0')))
+                total_fee += _to_cents(self._parse_money(row.get('fee', '0')))
+                count += 1
 
             return {
-                'gross': float(total_gross),
-                'fee': float(total_fee),
+                'gross': total_gross / 100,
+                'fee': total_fee / 100,
                 'count': count
             }
 
@@ -2318,8 +3261,7 @@ class CompleteCsvService:
         """Read Balance Summary from Stripe's exported CSV file if available"""
         # Look for files like: cgge_Balance_Summary_HKD_2025-11-01_to_2025-11-29_UTC.csv
         pattern = f"{company_filter}_Balance_Summary_*.csv"
-        search_path = os.path.join(self.root_directory, pattern)
-        files = glob.glob(search_path)
+        files = self._find_root_files(pattern)
 
         if not files:
             return None
@@ -2329,7 +3271,7 @@ class CompleteCsvService:
             filename = os.path.basename(file_path)
             # Extract date from filename
             if f"{year}-{month:02d}" in filename:
-                return self._parse_stripe_balance_summary(file_path)
+                return self._cached_report(self._parse_stripe_balance_summary, file_path)
 
         return None
 
@@ -2337,39 +3279,24 @@ class CompleteCsvService:
         """Parse Stripe's Balance Summary CSV format"""
         try:
             data = {}
-            with open(file_path, 'r', newline='', encoding='utf-8') as file:
+            fields = self._BALANCE_SUMMARY_FIELDS
+            with _open_csv(file_path) as file:
                 reader = csv.DictReader(file)
 
                 for row in reader:
                     category = row.get('category', '').strip()
-                    description = row.get('description', '').strip()
-                    net_amount = self._parse_decimal(row.get('net_amount', '0'))
                     currency = row.get('currency', 'hkd').strip().lower()
 
-                    if category == 'starting_balance':
-                        data['starting_balance'] = float(net_amount)
-                    elif category == 'activity_gross':
-                        data['activity_gross'] = float(net_amount)
-                    elif category == 'activity_fee':
-                        data['activity_fee'] = float(net_amount)
-                    elif category == 'activity':
-                        data['activity_net'] = float(net_amount)
-                    elif category == 'payouts_gross':
-                        data['payouts_gross'] = float(net_amount)
-                    elif category == 'payouts_fee':
-                        data['payouts_fee'] = float(net_amount)
-                    elif category == 'payouts':
-                        data['payouts_net'] = float(net_amount)
-                    elif category == 'ending_balance':
-                        data['ending_balance'] = float(net_amount)
+                    field = fields.get(category)
+                    if field is not None:
+                        data[field] = float(self._parse_decimal(row.get('net_amount', '0')))
 
                     data['currency'] = currency
 
             # Extract date range from filename
             filename = os.path.basename(file_path)
             # Pattern: cgge_Balance_Summary_HKD_2025-11-01_to_2025-11-29_UTC.csv
-            import re
-            date_match = re.search(r'(\d{4}-\d{2}-\d{2})_to_(\d{4}-\d{2}-\d{2})', filename)
+            date_match = _DATE_RANGE_RE.search(filename)
             if date_match:
                 data['start_date'] = date_match.group(1)
                 data['end_date'] = date_match.group(2)
@@ -2410,7 +3337,7 @@ class CompleteCsvService:
         else:
             end_date = datetime(year, month + 1, 1).date() - timedelta(days=1)
         
-        all_transactions = self.import_transactions_from_csv()
+        all_transactions = self._load_transactions()
         
         # Filter transactions by TRANSFER DATE (when they were paid out)
         payout_transactions = []
@@ -2424,60 +3351,23 @@ class CompleteCsvService:
             if transfer_date:
                 if start_date <= transfer_date <= end_date:
                     # This transaction was paid out during this month
-                    payout_transactions.append(tx)
+                    payout_transactions.append(tx.copy())
                 elif transfer_date > end_date:
                     # This transaction will be paid out in the future (ending balance)
-                    ending_balance_transactions.append(tx)
+                    ending_balance_transactions.append(tx.copy())
         
         # Sort by transfer date
         payout_transactions.sort(key=lambda x: x.get('transfer_date') or datetime.min.date())
         
         # Calculate totals for payout reconciliation with enhanced precision
-        charges_count = 0
-        charges_gross = Decimal('0')
-        charges_fees = Decimal('0')
-        refunds_count = 0
-        refunds_gross = Decimal('0')
-        payout_reversals_count = 0
-        payout_reversals_gross = Decimal('0')
-        
         self.logger.info(f"Processing {len(payout_transactions)} payout transactions for {company_filter} {year}-{month:02d}")
+        (charges_count, charges_gross, charges_fees, refunds_count, refunds_gross,
+         payout_reversals_count, payout_reversals_gross) = self._payout_bucket_totals(payout_transactions)
         
-        for tx in payout_transactions:
-            if tx['type'] in ['charge', 'payment']:
-                if not tx.get('is_fee'):
-                    charges_count += 1
-                    charges_gross += Decimal(str(tx['debit']))
-            elif tx['type'] == 'fee' or tx.get('is_fee'):
-                # Use absolute value for fees to ensure proper calculation
-                charges_fees += abs(Decimal(str(tx['credit'])))
-            elif tx['type'] == 'refund':
-                refunds_count += 1
-                refunds_gross += Decimal(str(tx['debit']))
-            elif tx['type'] == 'payout_failure':
-                payout_reversals_count += 1
-                payout_reversals_gross += Decimal(str(tx['debit']))
-        
-        # Calculate ending balance items with enhanced precision
-        ending_charges_count = 0
-        ending_charges_gross = Decimal('0')
-        ending_charges_fees = Decimal('0')
-        ending_payout_reversals_count = 0
-        ending_payout_reversals_gross = Decimal('0')
-        
+        # Calculate ending balance items with enhanced precision (refunds are not part of it)
         self.logger.info(f"Processing {len(ending_balance_transactions)} ending balance transactions")
-        
-        for tx in ending_balance_transactions:
-            if tx['type'] in ['charge', 'payment']:
-                if not tx.get('is_fee'):
-                    ending_charges_count += 1
-                    ending_charges_gross += Decimal(str(tx['debit']))
-            elif tx['type'] == 'fee' or tx.get('is_fee'):
-                # Use absolute value for fees
-                ending_charges_fees += abs(Decimal(str(tx['credit'])))
-            elif tx['type'] == 'payout_failure':
-                ending_payout_reversals_count += 1
-                ending_payout_reversals_gross += Decimal(str(tx['debit']))
+        (ending_charges_count, ending_charges_gross, ending_charges_fees, _, _,
+         ending_payout_reversals_count, ending_payout_reversals_gross) = self._payout_bucket_totals(ending_balance_transactions)
         
         # Calculate total paid out with proper precision
         total_paid_out = (
@@ -2544,6 +3434,39 @@ class CompleteCsvService:
             'ending_balance_transactions': ending_balance_transactions
         }
     
+    @staticmethod
+    def _payout_bucket_totals(transactions):
+        """
+        Classify payout reconciliation transactions in one pass.
+
+        Returns (charges_count, charges_gross, charges_fees, refunds_count,
+        refunds_gross, payout_reversals_count, payout_reversals_gross); the
+        amounts are summed in integer cents and returned as 2-place Decimals.
+        """
+        charges_count = charges_gross = charges_fees = 0
+        refunds_count = refunds_gross = 0
+        reversals_count = reversals_gross = 0
+
+        for tx in transactions:
+            tx_type = tx['type']
+            if tx_type in _CHARGE_TYPES:
+                if not tx.get('is_fee'):
+                    charges_count += 1
+                    charges_gross += _to_cents(tx['debit'])
+            elif tx_type == 'fee' or tx.get('is_fee'):
+                # Use absolute value for fees to ensure proper calculation
+                charges_fees += abs(_to_cents(tx['credit']))
+            elif tx_type == 'refund':
+                refunds_count += 1
+                refunds_gross += _to_cents(tx['debit'])
+            elif tx_type == 'payout_failure':
+                reversals_count += 1
+                reversals_gross += _to_cents(tx['debit'])
+
+        return (charges_count, Decimal(charges_gross).scaleb(-2), Decimal(charges_fees).scaleb(-2),
+                refunds_count, Decimal(refunds_gross).scaleb(-2),
+                reversals_count, Decimal(reversals_gross).scaleb(-2))
+
     def export_monthly_statement_csv(self, statement_data):
         """Export monthly statement to CSV format"""
         try:
@@ -2574,9 +3497,9 @@ class CompleteCsvService:
                 f"Opening balance for {statement_data['month']}/{statement_data['year']}"
             ])
             
-            # Write transaction rows
-            for tx in statement_data['transactions']:
-                writer.writerow([
+            # Write transaction rows (one writerows call drives the loop in C)
+            writer.writerows(
+                (
                     tx['date'].strftime('%Y-%m-%d') if tx['date'] else '',
                     tx['nature'],
                     tx['party'],
@@ -2585,7 +3508,9 @@ class CompleteCsvService:
                     f"{tx['balance']:.2f}",
                     "No" if not tx['acknowledged'] else "Yes",
                     tx['description']
-                ])
+                )
+                for tx in statement_data['transactions']
+            )
             
             # Write closing balance row
             closing_balance = statement_data['closing_balance']
@@ -2614,12 +3539,7 @@ class CompleteCsvService:
     
     def _get_last_day_of_month(self, year, month):
         """Get the last day of the month"""
-        if month == 12:
-            next_month = datetime(year + 1, 1, 1)
-        else:
-            next_month = datetime(year, month + 1, 1)
-        last_day = next_month - timedelta(days=1)
-        return last_day.day
+        return monthrange(year, month)[1]
     
     def get_available_companies(self):
         """Get list of companies from CSV files"""
@@ -2637,7 +3557,7 @@ class CompleteCsvService:
     
     def get_available_months(self):
         """Get list of available months from transaction data"""
-        transactions = self.import_transactions_from_csv()
+        transactions = self._load_transactions()
         months = set()
         
         for tx in transactions:
@@ -2649,31 +3569,9 @@ class CompleteCsvService:
     def _get_previous_month_closing_balance(self, year, month, company_filter):
         """Get the closing balance from the previous month"""
         try:
-            # Get all transactions for the company
-            all_transactions = self.import_transactions_from_csv()
-            
-            # Filter by company if specified
-            if company_filter:
-                all_transactions = [tx for tx in all_transactions if tx['company_code'] == company_filter]
-            
-            # Sort all transactions by date
-            all_transactions.sort(key=lambda x: x['date'] if x['date'] else datetime.min.date())
-            
-            # Calculate running balance up to the end of the previous month
+            # Balance up to the end of the previous month
             target_date = datetime(year, month, 1).date() - timedelta(days=1)  # Last day of previous month
-            
-            running_balance = Decimal('0')
-            for tx in all_transactions:
-                if tx['date'] and tx['date'] <= target_date:
-                    debit = Decimal(str(tx['debit']))
-                    credit = Decimal(str(tx['credit']))
-                    
-                    # Standard debit/credit logic: debits increase balance, credits decrease balance
-                    running_balance += debit - credit
-                else:
-                    break  # Stop when we reach the target month
-            
-            return float(running_balance)
+            return self._closing_balance_on(company_filter, target_date) / 100
             
         except Exception as e:
             self.logger.warning(f"Could not get previous month balance: {e}")
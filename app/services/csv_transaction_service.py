@@ -6,6 +6,9 @@ from typing import List, Dict, Optional
 import re
 import logging
 
+# Read buffer for CSV exports (1 MiB instead of the 8 KiB default)
+CSV_READ_BUFFER = 1 << 20
+
 class CSVTransactionService:
     """Service to read transaction data from CSV files with robust deployment support"""
     
@@ -243,7 +246,7 @@ class CSVTransactionService:
                 self.logger.error(f"CSV file not readable: {csv_file}")
                 return []
             
-            with open(csv_file, 'r', newline='', encoding='utf-8-sig') as file:  # utf-8-sig handles BOM
+            with open(csv_file, 'r', newline='', encoding='utf-8-sig', buffering=CSV_READ_BUFFER) as file:  # utf-8-sig handles BOM
                 reader = csv.DictReader(file)
                 
                 # Check if file has expected headers
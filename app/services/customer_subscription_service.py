@@ -12,7 +12,7 @@ class CustomerSubscriptionService:
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
-        self.csv_service = CompleteCsvService()
+        self.csv_service = CompleteCsvService(keep_raw_row=True)
         
         # Subscription plan mappings
         self.plan_names = {
@@ -34,7 +34,7 @@ app = Flask(__name__)
 app.config['DEBUG'] = False
 
 # Initialize CSV service
-csv_service = CompleteCsvService()
+csv_service = CompleteCsvService(keep_raw_row=True)
 
 @app.route('/')
 def home():
@@ -0,0 +1,55 @@
+import pytest
+
+import app.services.complete_csv_service as service_module
+from app.services.complete_csv_service import CompleteCsvService
+
+# Optional dependencies switched off for each backend of the CSV service
+BACKEND_PATCHES = {
+    'arrow': (),
+    'pandas': ('pa',),
+    'csv': ('pa', 'pd'),
+    'no-numpy': ('np',),
+}
+
+
+def clear_service_caches():
+    for cache in (service_module._TRANSACTION_CACHE, service_module._DATE_INDEX_CACHE,
+                  service_module._BALANCE_INDEX_CACHE, service_module._FILE_TRANSACTION_CACHE,
+                  service_module._DIRECTORY_CACHE, service_module._REPORT_CACHE):
+        cache.clear()
+
+
+def _run_with_backend(backend, root, call):
+    """call(service) for a service reading root, with only the given backend's dependencies, on fresh caches"""
+    if backend == 'arrow' and service_module.pa is None:
+        pytest.skip('pyarrow is not installed')
+    if backend in ('arrow', 'pandas') and service_module.pd is None:
+        pytest.skip('pandas is not installed')
+    if backend != 'no-numpy' and service_module.np is None:
+        pytest.skip('numpy is not installed')
+
+    with pytest.MonkeyPatch.context() as mp:
+        for name in BACKEND_PATCHES[backend]:
+            mp.setattr(service_module, name, None)
+        mp.setenv('ROOT_CSV_PATH', str(root))
+        clear_service_caches()
+        try:
+            return call(CompleteCsvService(csv_directory=str(root / 'complete_csv')))
+        finally:
+            clear_service_caches()
+
+
+@pytest.fixture
+def run_with_backend():
+    return _run_with_backend
+
+
+@pytest.fixture
+def clear_caches():
+    return clear_service_caches
+
+
+@pytest.fixture
+def root(tmp_path):
+    (tmp_path / 'complete_csv').mkdir()
+    return tmp_path
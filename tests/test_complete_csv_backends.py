@@ -0,0 +1,168 @@
+"""
+CompleteCsvService on the bundled sample exports: every backend (PyArrow,
+pandas, the csv module, no NumPy), the process-pool paths and the import
+caches must give the same results.
+"""
+import os
+import shutil
+from datetime import date
+
+import numpy as np
+import pytest
+
+import app.services.complete_csv_service as service_module
+from app.services.complete_csv_service import _PartyLookup
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Root-directory samples; complete_csv/ and data/ are copied whole
+ROOT_SAMPLES = (
+    'cgge_unified_payments_till_30Nov2025.csv',
+    '776431710MONTH_TRADE_DATA20251201120858.csv',
+    'cgge_Balance_Summary_HKD_2025-11-01_to_2025-11-29_UTC.csv',
+    'cgge_Itemised_balance_change_from_activity_HKD_2025-11-01_to_2025-11-29_UTC.csv',
+    'cgge_Itemised_payouts_HKD_2025-11-01_to_2025-11-29_UTC.csv',
+)
+
+MONTHLY_STATEMENTS = ((2024, 3, 'cgge'), (2025, 8, 'cgge'), (2025, 3, 'ki'), (2023, 5, 'kt'), (2025, 11, 'cgge'))
+STRIPE_REPORT_STATEMENTS = ((2025, 11, 'cgge'), (2025, 12, 'cgge'), (2025, 11, 'cgge_sz'))
+BALANCE_SUMMARIES = ((2025, 11, 'cgge'), (2025, 3, 'ki'), (2023, 5, 'kt'))
+
+
+@pytest.fixture
+def sample_root(tmp_path):
+    for name in ROOT_SAMPLES:
+        shutil.copy(os.path.join(REPO_ROOT, name), tmp_path / name)
+    shutil.copytree(os.path.join(REPO_ROOT, 'complete_csv'), tmp_path / 'complete_csv')
+    shutil.copytree(os.path.join(REPO_ROOT, 'data'), tmp_path / 'data')
+    # December statements read data/cgge_balance_history.csv plus this summary
+    shutil.copy(os.path.join(REPO_ROOT, 'data', 'CGGE_Balance_Summary_2025-12-01__2025-12-31_UTC.csv'),
+                tmp_path / 'cgge_Balance_Summary_2025-12-01_to_2025-12-31_UTC.csv')
+    return tmp_path
+
+
+def sample_outputs(service):
+    return {
+        'transactions': service.import_transactions_from_csv(),
+        'monthly_statements': [service.generate_monthly_statement(year, month, company)
+                               for year, month, company in MONTHLY_STATEMENTS],
+        'stripe_report_statements': [service.generate_monthly_statement_from_stripe_reports(year, month, company)
+                                     for year, month, company in STRIPE_REPORT_STATEMENTS],
+        'balance_summaries': [service.generate_balance_summary(year, month, company)
+                              for year, month, company in BALANCE_SUMMARIES],
+        'payout_reconciliation': service.generate_payout_reconciliation(2025, 8, 'cgge'),
+    }
+
+
+@pytest.mark.parametrize('backend', ['arrow', 'pandas', 'no-numpy'])
+def test_backend_matches_csv_module(run_with_backend, sample_root, backend):
+    expected = run_with_backend('csv', sample_root, sample_outputs)
+
+    assert run_with_backend(backend, sample_root, sample_outputs) == expected
+
+
+def test_sample_outputs_are_populated(run_with_backend, sample_root):
+    outputs = run_with_backend('csv', sample_root, sample_outputs)
+
+    assert len(outputs['transactions']) > 200
+    for statement in outputs['monthly_statements']:
+        assert statement['transactions']
+        # Running balances are summed in cents, so they stay on whole cents
+        assert statement['closing_balance'] == round(statement['closing_balance'], 2)
+    for statement in outputs['stripe_report_statements']:
+        assert 'error' not in statement
+        assert statement['transactions']
+
+
+def parallel_and_serial(service, clear_caches):
+    results = {}
+    jobs = [(year, month, company) for year, month, company in STRIPE_REPORT_STATEMENTS]
+    for use_parallel in (False, True):
+        clear_caches()
+        results[use_parallel] = (
+            service.import_transactions_from_csv(use_parallel=use_parallel),
+            service.generate_monthly_statements_bulk(2025, 8, ['cgge', 'ki', 'kt'], use_parallel=use_parallel),
+            service.generate_stripe_report_statements_bulk(jobs, use_parallel=use_parallel),
+        )
+    return results
+
+
+@pytest.mark.parametrize('backend', ['arrow', 'csv'])
+def test_process_pool_matches_serial(run_with_backend, clear_caches, sample_root, backend):
+    results = run_with_backend(backend, sample_root, lambda service: parallel_and_serial(service, clear_caches))
+
+    assert results[True] == results[False]
+    transactions, statements, report_statements = results[False]
+    assert transactions
+    assert len(statements) == 3
+    assert len(report_statements) == len(STRIPE_REPORT_STATEMENTS)
+
+
+def edit_sample_files(service, root, clear_caches):
+    """Import and report results before and after the unified export and Balance Summary change on disk"""
+    def snapshot():
+        return (service.import_transactions_from_csv(),
+                service.generate_balance_summary(2025, 11, 'cgge'))
+
+    before = snapshot()
+    assert snapshot() == before
+
+    unified = root / 'cgge_unified_payments_till_30Nov2025.csv'
+    lines = unified.read_text(encoding='utf-8-sig').splitlines(keepends=True)
+    unified.write_text(''.join(lines[:-10]), encoding='utf-8')
+    summary = root / 'cgge_Balance_Summary_HKD_2025-11-01_to_2025-11-29_UTC.csv'
+    summary.write_text(summary.read_text(encoding='utf-8-sig').replace('367.38', '367.39'), encoding='utf-8')
+
+    after = snapshot()
+    clear_caches()
+    return before, after, snapshot()
+
+
+@pytest.mark.parametrize('backend', ['arrow', 'csv'])
+def test_caches_follow_file_changes(run_with_backend, clear_caches, sample_root, backend):
+    before, after, fresh = run_with_backend(backend, sample_root,
+                                            lambda service: edit_sample_files(service, sample_root, clear_caches))
+
+    assert after == fresh
+    assert len(after[0]) < len(before[0])
+    assert after[1]['starting_balance'] == 367.39 != before[1]['starting_balance']
+
+
+def party_entries():
+    return {
+        _PartyLookup.key(date(2025, 11, day), amount): {'party': f'{day}:{amount}'}
+        for day in range(1, 29) for amount in (0.01, 19.9, 98.0, 1234.56)
+    }
+
+
+@pytest.mark.parametrize('use_numpy', [True, False])
+def test_party_lookup(monkeypatch, use_numpy):
+    if not use_numpy:
+        monkeypatch.setattr(service_module, 'np', None)
+    lookup = _PartyLookup(party_entries())
+
+    assert len(lookup) == 28 * 4
+    assert lookup.get(date(2025, 11, 3), 19.90) == {'party': '3:19.9'}
+    assert lookup.get(date(2025, 11, 28), 1234.56) == {'party': '28:1234.56'}
+    assert lookup.get(date(2025, 11, 3), 19.91) is None
+    assert lookup.get(date(2025, 12, 3), 19.9) is None
+    assert lookup.get(None, 19.9) is None
+    assert lookup.get(date(2025, 11, 3), 'n/a') is None
+    assert _PartyLookup().get(date(2025, 11, 3), 19.9) is None
+
+
+def test_running_balance_scans_agree():
+    rng = np.random.default_rng(0)
+    delta_cents = rng.integers(-50000, 50000, size=500).astype(np.int64)
+    transfer_ords = rng.integers(738000, 738100, size=500).astype(np.int64)
+
+    for end_ord, exclude_until_ord in ((738050, 738060), (738000, 738100), (738099, 738099)):
+        balances, closing = service_module._running_balance_scan_numpy(
+            delta_cents, transfer_ords, end_ord, exclude_until_ord, 12345)
+        loop_balances, loop_closing = service_module._running_balance_scan_loop(
+            delta_cents, transfer_ords, end_ord, exclude_until_ord, 12345)
+        scan_balances, scan_closing = service_module._running_balance_scan(
+            delta_cents, transfer_ords, end_ord, exclude_until_ord, 12345)
+
+        assert balances.tolist() == loop_balances.tolist() == scan_balances.tolist()
+        assert closing == loop_closing == scan_closing
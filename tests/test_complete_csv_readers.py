@@ -0,0 +1,169 @@
+"""
+CompleteCsvService CSV readers: PyArrow, pandas and the csv module must
+give the same rows for the same file, including malformed exports.
+"""
+import csv
+import os
+import shutil
+from datetime import date
+
+import app.services.complete_csv_service as service_module
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UNIFIED_SAMPLE = os.path.join(REPO_ROOT, 'cgge_unified_payments_till_30Nov2025.csv')
+BALANCE_HISTORY_SAMPLE = os.path.join(REPO_ROOT, 'data', 'cgge_balance_history.csv')
+ITEMISED_ACTIVITY_SAMPLE = os.path.join(
+    REPO_ROOT, 'cgge_Itemised_balance_change_from_activity_HKD_2025-11-01_to_2025-11-29_UTC.csv')
+ITEMISED_PAYOUTS_SAMPLE = os.path.join(REPO_ROOT, 'cgge_Itemised_payouts_HKD_2025-11-01_to_2025-11-29_UTC.csv')
+BALANCE_SUMMARY_SAMPLE = os.path.join(REPO_ROOT, 'data', 'CGGE_Balance_Summary_2025-12-01__2025-12-31_UTC.csv')
+
+BACKENDS = ('arrow', 'pandas', 'csv')
+
+
+def import_with_each_backend(run_with_backend, root):
+    return {backend: run_with_backend(backend, root, lambda service: service.import_transactions_from_csv())
+            for backend in BACKENDS}
+
+
+def read_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        return list(csv.reader(file))
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        csv.writer(file).writerows(rows)
+
+
+def paid_row_indexes(rows):
+    status = rows[0].index('Status')
+    return [i for i, row in enumerate(rows) if i and row[status].strip().lower() == 'paid']
+
+
+def test_sample_unified_export_matches_across_backends(run_with_backend, root):
+    shutil.copy(UNIFIED_SAMPLE, root / 'cgge_unified_payments_test.csv')
+
+    results = import_with_each_backend(run_with_backend, root)
+
+    assert results['arrow']
+    assert results['arrow'] == results['pandas'] == results['csv']
+
+
+def test_short_row_is_padded_not_fatal(run_with_backend, root):
+    rows = read_rows(UNIFIED_SAMPLE)
+    rows.insert(7, rows[6][:16])
+    write_rows(root / 'cgge_unified_payments_test.csv', rows)
+
+    results = import_with_each_backend(run_with_backend, root)
+
+    assert results['csv']
+    assert results['arrow'] == results['pandas'] == results['csv']
+
+
+def test_short_row_after_first_arrow_batch(run_with_backend, root, monkeypatch):
+    # Small blocks so Arrow has already yielded batches when it hits the bad row
+    monkeypatch.setattr(service_module, 'ARROW_BLOCK_SIZE', 1 << 12)
+    rows = read_rows(UNIFIED_SAMPLE)
+    rows.insert(len(rows) - 3, rows[-3][:16])
+    write_rows(root / 'cgge_unified_payments_test.csv', rows)
+
+    results = import_with_each_backend(run_with_backend, root)
+
+    assert results['csv']
+    assert results['arrow'] == results['pandas'] == results['csv']
+
+
+def test_quoted_multiline_descriptions(run_with_backend, root, monkeypatch, caplog):
+    monkeypatch.setattr(service_module, 'ARROW_BLOCK_SIZE', 1 << 12)
+    plain = root / 'plain'
+    (plain / 'complete_csv').mkdir(parents=True)
+    shutil.copy(UNIFIED_SAMPLE, plain / 'cgge_unified_payments_test.csv')
+    expected = run_with_backend('csv', plain, lambda service: service.import_transactions_from_csv())
+
+    rows = read_rows(UNIFIED_SAMPLE)
+    description = rows[0].index('Description')
+    for i in paid_row_indexes(rows):
+        rows[i][description] = f'Line one of {i}\nline two\r\nline three'
+    write_rows(root / 'cgge_unified_payments_test.csv', rows)
+
+    results = import_with_each_backend(run_with_backend, root)
+
+    assert len(results['csv']) == len(expected)
+    assert results['arrow'] == results['pandas'] == results['csv']
+    # Arrow read the file itself rather than falling back to pandas
+    assert 'Arrow could not read' not in caplog.text
+
+
+def write_balance_history(root, mutate=None):
+    rows = read_rows(BALANCE_HISTORY_SAMPLE)
+    if mutate is not None:
+        mutate(rows)
+    (root / 'data').mkdir(exist_ok=True)
+    write_rows(root / 'data' / 'cgge_balance_history.csv', rows)
+    shutil.copy(BALANCE_SUMMARY_SAMPLE, root / 'cgge_Balance_Summary_2025-12-01_to_2025-12-31_UTC.csv')
+
+
+def truncate_december_rows(rows):
+    # A short copy of a December payment and of a December payout
+    types = rows[0].index('Type')
+    for kind in ('payment', 'payout'):
+        row = next(row for row in rows[1:] if row[types] == kind and '2025-12' in row[9])
+        rows.insert(5, row[:12])
+
+
+def balance_history_statement(service):
+    return service.generate_monthly_statement_from_stripe_reports(2025, 12, 'cgge')
+
+
+def test_balance_history_short_rows_match_across_backends(run_with_backend, root):
+    write_balance_history(root)
+    clean = run_with_backend('csv', root, balance_history_statement)
+    write_balance_history(root, truncate_december_rows)
+
+    results = {backend: run_with_backend(backend, root, balance_history_statement)
+               for backend in BACKENDS}
+
+    assert results['arrow'] == results['pandas'] == results['csv']
+    # The malformed rows don't take the rest of the file down with them
+    assert len(results['arrow']['transactions']) >= len(clean['transactions'])
+
+
+def truncate_first_row(source, target, width):
+    rows = read_rows(source)
+    rows.insert(2, rows[1][:width])
+    write_rows(target, rows)
+
+
+def itemised_reports(service):
+    start, end = date(2025, 11, 1), date(2025, 11, 30)
+    return (service._read_stripe_itemised_activity(2025, 11, 'cgge', start, end),
+            service._read_stripe_itemised_payouts_detail(2025, 11, 'cgge', start, end),
+            service._read_stripe_itemised_payouts(2025, 11, 'cgge', start, end))
+
+
+def test_itemised_reports_short_rows_match_across_backends(run_with_backend, root):
+    truncate_first_row(ITEMISED_ACTIVITY_SAMPLE, root / os.path.basename(ITEMISED_ACTIVITY_SAMPLE), 8)
+    truncate_first_row(ITEMISED_PAYOUTS_SAMPLE, root / os.path.basename(ITEMISED_PAYOUTS_SAMPLE), 7)
+
+    results = {backend: run_with_backend(backend, root, itemised_reports) for backend in BACKENDS}
+
+    assert results['arrow'] == results['pandas'] == results['csv']
+    activity, payouts, payout_totals = results['arrow']
+    assert len(activity) >= 18
+    assert len(payouts) >= 10
+    assert payout_totals['count'] >= 10
+
+
+def balance_history_payouts(service):
+    return service._read_stripe_itemised_payouts_detail(2025, 12, 'cgge', date(2025, 12, 1), date(2025, 12, 31))
+
+
+def test_balance_history_payouts_short_rows_match_across_backends(run_with_backend, root):
+    write_balance_history(root)
+    clean = run_with_backend('csv', root, balance_history_payouts)
+    write_balance_history(root, truncate_december_rows)
+
+    results = {backend: run_with_backend(backend, root, balance_history_payouts) for backend in BACKENDS}
+
+    assert results['arrow'] == results['pandas'] == results['csv']
+    assert len(results['arrow']) >= len(clean) > 0